@@ -1,6 +1,8 @@
 from app import create_app
 
-app = create_app()
+# export 작업 워커(spawn)는 이 파일을 __mp_main__으로 다시 실행하므로 그때는 앱(데이터 로딩)을 만들지 않음
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001, debug=True)
@@ -5,7 +5,7 @@ from flask import Flask
 
 from app.routes.search import search_bp
 from app.routes.dashboard import dashboard_bp
-from app.services import data_store as ds
+from app.services import data_store as ds, export_jobs
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +36,9 @@ def create_app() -> Flask:
     app.register_blueprint(search_bp)
     app.register_blueprint(dashboard_bp)
 
+    # 만료된 export 파일 정리 (이전 프로세스가 남긴 파일 포함)
+    export_jobs.start_sweeper()
+
     # Warm up in-memory datastore on startup so 첫 페이지 로딩 시 데이터 적재 지연을 줄임
     try:
         ds._get_data_store()
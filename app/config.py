@@ -36,3 +36,20 @@ SCREEN_LEGACY_CSV = _path_from_env("SAP_SCREEN_LEGACY_PATH", SHARED_TOTAL_CSV)
 
 # Dashboard dataset path (shared)
 DASHBOARD_TOTAL_CSV = _path_from_env("SAP_DASHBOARD_TOTAL_DATA", SHARED_TOTAL_CSV)
+
+# Interval (seconds) at which the data files are checked for changes
+DATA_POLL_SECONDS = float(os.getenv("SAP_DATA_POLL_SECONDS", "2"))
+
+# Prepared DataStore snapshots (fast restart without re-normalizing the DB)
+SNAPSHOT_DIR = _path_from_env("SAP_SNAPSHOT_DIR", DATA_DIR / "cache")
+
+# In-memory search result caches (filter/selection/table rows), total budget in MB
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SAP_SEARCH_CACHE_MB", "256")) * 1024 * 1024
+
+# Background Excel export jobs: finished files location, concurrent jobs, lifetime and cleanup interval (seconds)
+EXPORT_DIR = _path_from_env("SAP_EXPORT_DIR", DATA_DIR / "exports")
+EXPORT_MAX_WORKERS = int(os.getenv("SAP_EXPORT_MAX_WORKERS", "1"))
+EXPORT_JOB_TTL = int(os.getenv("SAP_EXPORT_JOB_TTL", "1800"))
+EXPORT_SWEEP_SECONDS = float(os.getenv("SAP_EXPORT_SWEEP_SECONDS", "300"))
+# Scheduling priority (nice increment) of export worker processes so searches get the CPU first (POSIX only)
+EXPORT_WORKER_NICE = int(os.getenv("SAP_EXPORT_WORKER_NICE", "10"))
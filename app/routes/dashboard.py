@@ -1,9 +1,10 @@
+import json
 import os
 import time
 from flask import Blueprint, abort, render_template, request, jsonify
 
 from app.services.data_loader import load_data
-from app.services import dashboard_data as dd
+from app.services import cache, dashboard_cube as dc, dashboard_data as dd, dataset
 from app import config
 
 dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
@@ -40,18 +41,21 @@ VIEW_CONFIG = {
 }
 
 DEFAULT_EQUIPMENT = "1005504"
-_PREPROCESS_CACHE = {"df": None, "mtime": 0.0}
-_PAYLOAD_CACHE = {"data": {}, "mtime": 0.0}
+# 모든 캐시는 dataset.data_epoch() 기준 (DB가 바뀌면 감시 스레드가 epoch를 올림)
+_PREPROCESS_CACHE = {"df": None, "epoch": -1}
+_PAYLOAD_CACHE = {"data": {}, "epoch": -1}
+# 필터 차트 API는 전처리 DF 대신 사전 집계 큐브를 잘라서 응답
+_CUBE_CACHE = {"cube": None, "epoch": -1}
+# 필터 차트 API 결과: (epoch, 요청 본문) -> 결과
+_FILTER_RESULT_CACHE = cache.register("dashboard_filter", config.SEARCH_CACHE_MAX_BYTES // 16)
 
 
 def _get_preprocessed_df():
-    """DB 변경이 없으면 전처리된 DF를 캐시로 재사용."""
-    try:
-        mtime = config.SAP_DB_PATH.stat().st_mtime
-    except Exception:
-        mtime = 0.0
-
-    if _PREPROCESS_CACHE["df"] is not None and _PREPROCESS_CACHE["mtime"] == mtime:
+    """데이터 epoch가 같으면 전처리된 DF를 캐시로 재사용."""
+    # 파일을 처음 읽기 전에도 감시를 시작해 이후 변경이 epoch에 반영되도록 함
+    dataset.watch([config.DASHBOARD_TOTAL_CSV])
+    epoch = dataset.data_epoch()
+    if _PREPROCESS_CACHE["df"] is not None and _PREPROCESS_CACHE["epoch"] == epoch:
         return _PREPROCESS_CACHE["df"]
 
     df = load_data()
@@ -60,22 +64,43 @@ def _get_preprocessed_df():
 
     df = dd.preprocess(df)
     _PREPROCESS_CACHE["df"] = df
-    _PREPROCESS_CACHE["mtime"] = mtime
+    _PREPROCESS_CACHE["epoch"] = epoch
     return df
 
 
+def _get_cube():
+    """데이터 epoch마다 필터 차트용 큐브를 한 번만 생성."""
+    epoch = dataset.data_epoch()
+    if _CUBE_CACHE["cube"] is not None and _CUBE_CACHE["epoch"] == epoch:
+        return _CUBE_CACHE["cube"]
+
+    df = _get_preprocessed_df()
+    if df.empty:
+        return None
+
+    cube = dc.build_cube(df)
+    _CUBE_CACHE["cube"] = cube
+    _CUBE_CACHE["epoch"] = epoch
+    return cube
+
+
+def _slice_cube(cube, data):
+    """요청의 view(작업반)와 기간으로 큐브 셀 선택."""
+    view = data.get("view")
+    workctrs = VIEW_CONFIG[view]["workctrs"] if view and view in VIEW_CONFIG else None
+    return cube.slice(workctrs, data.get("start_ym"), data.get("end_ym"))
+
+
 def _get_payload(view=None):
-    """DB가 변하지 않으면 payload까지 캐시해 페이지 진입 속도 단축."""
-    try:
-        mtime = config.SAP_DB_PATH.stat().st_mtime
-    except Exception:
-        mtime = 0.0
+    """데이터 epoch가 같으면 payload까지 캐시해 페이지 진입 속도 단축."""
+    epoch = dataset.data_epoch()
+    if _PAYLOAD_CACHE["epoch"] != epoch:
+        _PAYLOAD_CACHE["data"] = {}
+        _PAYLOAD_CACHE["epoch"] = epoch
 
     key = view or "_main"
-    cache_mtime = _PAYLOAD_CACHE.get("mtime", 0.0)
     cache_entry = _PAYLOAD_CACHE["data"].get(key)
-
-    if cache_entry and cache_mtime == mtime:
+    if cache_entry:
         return cache_entry
 
     df = _get_preprocessed_df()
@@ -84,10 +109,13 @@ def _get_payload(view=None):
 
     payload = _build_payload(df if view is None else df, view)
     _PAYLOAD_CACHE["data"][key] = payload
-    _PAYLOAD_CACHE["mtime"] = mtime
     return payload
 
 
+def _filter_cache_key(name, data):
+    return (dataset.data_epoch(), name, json.dumps(data, sort_keys=True, ensure_ascii=False, default=str))
+
+
 def _build_payload(df, view=None):
     equipment_damage_fn = getattr(dd, "equipment_damage_by_month", None)
     if equipment_damage_fn is None:
@@ -160,59 +188,55 @@ def filter_chart():
     try:
         data = request.get_json()
         chart_id = data.get("chart_id")
-        start_ym = data.get("start_ym")
-        end_ym = data.get("end_ym")
         view = data.get("view")  # electric, mechanical 등
 
-        df = _get_preprocessed_df()
-        if df.empty:
-            return jsonify({"error": "데이터가 없습니다."}), 500
-
-        # view 기준 작업반 필터
-        if view and view in VIEW_CONFIG:
-            config = VIEW_CONFIG[view]
-            df = df[df["WorkCtr.Text"].isin(config["workctrs"])]
+        cache_key = _filter_cache_key("filter-chart", data)
+        cached = _FILTER_RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
 
-        # 기간 필터
-        if start_ym and end_ym:
-            df = df[(df["년월"] >= start_ym) & (df["년월"] <= end_ym)]
+        cube = _get_cube()
+        if cube is None:
+            return jsonify({"error": "데이터가 없습니다."}), 500
+        view_slice = _slice_cube(cube, data)
 
         result = {}
 
         if chart_id == "trendChart":
-            result = dd.trend_by_cost_center(df)
+            result = dc.trend_by_cost_center(view_slice)
         elif chart_id == "damageChart":
-            result = dd.damage_trend(df)
+            result = dc.damage_trend(view_slice)
         elif chart_id == "costCenterPie":
-            result = dd.cost_center_pie(df)
+            result = dc.cost_center_pie(view_slice)
         elif chart_id == "workctrPie":
-            result = dd.workctr_pie(df)
+            result = dc.workctr_pie(view_slice)
         elif chart_id == "costChart":
             cost_type = data.get("cost_type")
             if cost_type:
-                result = dd.cost_monthly_filtered(df, cost_type)
+                result = dc.cost_monthly_filtered(view_slice, cost_type)
             else:
-                result = dd.cost_monthly(df)
+                result = dc.cost_monthly(view_slice)
         elif chart_id == "workctrTime":
-            result = dd.workctr_time(df)
+            result = dc.workctr_time(view_slice)
         elif chart_id == "equipmentDamage":
-            result = dd.equipment_damage_by_month(df, DEFAULT_EQUIPMENT)
+            result = dc.equipment_damage_by_month(view_slice, DEFAULT_EQUIPMENT)
         elif chart_id == "statusCost":
-            result = dd.status_by_cost_center(df)
+            result = dc.status_by_cost_center(view_slice)
         elif chart_id == "workctrComparison":
             if view and view in VIEW_CONFIG:
-                config = VIEW_CONFIG[view]
-                result = dd.workctr_order_and_work_comparison(
-                    df, config["workctrs"], config.get("label_map", {})
+                view_config = VIEW_CONFIG[view]
+                result = dc.workctr_order_and_work_comparison(
+                    view_slice, view_config["workctrs"], view_config.get("label_map", {})
                 )
             else:
                 result = {"order_count": {"labels": [], "datasets": []}, "actual_work": {"labels": [], "datasets": []}}
         elif chart_id == "costByCenter":
             cost_type = data.get("cost_type", "Total Cost")
-            result = dd.cost_by_cost_center(df, cost_type)
+            result = dc.cost_by_cost_center(view_slice, cost_type)
         else:
             return jsonify({"error": f"Unknown chart_id: {chart_id}"}), 400
 
+        _FILTER_RESULT_CACHE.set(cache_key, result)
         return jsonify(result)
 
     except Exception as e:
@@ -225,29 +249,19 @@ def filter_equipment_damage():
     try:
         data = request.get_json()
         equipment = data.get("equipment", "")
-        start_ym = data.get("start_ym")
-        end_ym = data.get("end_ym")
-        view = data.get("view")
-
-        df = _get_preprocessed_df()
-        if df.empty:
-            return jsonify({"error": "데이터가 없습니다."}), 500
 
-        if view and view in VIEW_CONFIG:
-            config = VIEW_CONFIG[view]
-            df = df[df["WorkCtr.Text"].isin(config["workctrs"])]
+        cache_key = _filter_cache_key("filter-equipment-damage", data)
+        cached = _FILTER_RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
 
-        if start_ym and end_ym:
-            df = df[(df["년월"] >= start_ym) & (df["년월"] <= end_ym)]
+        cube = _get_cube()
+        if cube is None:
+            return jsonify({"error": "데이터가 없습니다."}), 500
 
-        equipment_damage_fn = getattr(dd, "equipment_damage_by_month", None)
-        if equipment_damage_fn is None and hasattr(dd, "equipment_damage"):
-            result = dd.equipment_damage(df)
-        elif equipment_damage_fn:
-            result = equipment_damage_fn(df, equipment)
-        else:
-            result = {"labels": [], "datasets": []}
+        result = dc.equipment_damage_by_month(_slice_cube(cube, data), equipment)
 
+        _FILTER_RESULT_CACHE.set(cache_key, result)
         return jsonify(result)
 
     except Exception as e:
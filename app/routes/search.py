@@ -1,31 +1,86 @@
 from __future__ import annotations
 
 import io
-from typing import Dict, List
+from typing import IO, Dict, List, Set, Tuple
 
 import pandas as pd
-from flask import Blueprint, abort, jsonify, render_template, request, send_file, url_for
+from flask import (
+    Blueprint,
+    abort,
+    get_template_attribute,
+    jsonify,
+    make_response,
+    render_template,
+    request,
+    send_file,
+    url_for,
+)
 
 from app.services import data_store as ds
+from app.services import dataset, excel_export, export_jobs
+from app.services.cache import cache_stats
 
 search_bp = Blueprint("search", __name__)
 
+# 검색결과 export에서 주문 행을 만들 때 한 번에 처리하는 주문 수 (진행률 갱신 단위)
+EXPORT_ORDER_BATCH = 1000
+
+
+def _read_selections() -> Dict[str, str]:
+    return {key: request.args.get(key, "").strip() for key in ds.FILTER_KEYS}
+
+
+def _equipment_link_template(selections: Dict[str, str], limit_value: int) -> str:
+    return url_for(
+        "search.index",
+        middle_category=selections.get("middle_category", ""),
+        order_no="",
+        equipment_name="",
+        top_category="",
+        sub_category="",
+        equipment_no="EQUIPMENT_PLACEHOLDER",
+        # Equipment 클릭 시에는 첨부자료 필터(with_links)를 초기화해 자동 체크를 해제
+        with_links="",
+        search="1",
+        limit=limit_value,
+    )
+
+
+def _encode_cursor(epoch: int, offset: int) -> str:
+    return f"{epoch}:{offset}"
+
+
+def _decode_cursor(raw_value: str | None) -> Tuple[int, int] | None:
+    try:
+        epoch, offset = (int(part) for part in (raw_value or "").split(":"))
+    except ValueError:
+        return None
+    return (epoch, offset) if offset >= 0 else None
+
+
+def _cursor_offset(store: ds.DataStore, raw_value: str | None, required: bool = True) -> int:
+    """Result offset encoded in ``raw_value``; aborts with a JSON 400 (invalid) or 409 (older dataset epoch)."""
+    if not raw_value and not required:
+        return 0
+    cursor = _decode_cursor(raw_value)
+    if cursor is None:
+        abort(make_response(jsonify({"error": "invalid cursor"}), 400))
+    epoch, offset = cursor
+    if epoch != store.epoch:
+        abort(make_response(jsonify({"error": "stale cursor"}), 409))
+    return offset
+
+
+def _next_cursor(store: ds.DataStore, shown: int, total: int) -> str | None:
+    return _encode_cursor(store.epoch, shown) if shown < total else None
+
 
 @search_bp.route("/", methods=["GET"])
 def index():
     store = ds._get_data_store()
     data_available = not store.combined.empty
     limit_value = ds._resolve_limit(request.args.get("limit"))
-    selections = {
-        "equipment_no": request.args.get("equipment_no", "").strip(),
-        "order_no": request.args.get("order_no", "").strip(),
-        "equipment_name": request.args.get("equipment_name", "").strip(),
-        "top_category": request.args.get("top_category", "").strip(),
-        "middle_category": request.args.get("middle_category", "").strip(),
-        "sub_category": request.args.get("sub_category", "").strip(),
-        "with_links": request.args.get("with_links", "").strip(),
-        "detail_query": request.args.get("detail_query", "").strip(),
-    }
+    selections = _read_selections()
 
     search_triggered = request.args.get("search") == "1" or any(
         selections[key] for key in ds.SEARCH_SELECTION_KEYS if key in selections
@@ -34,12 +89,16 @@ def index():
     selected_orders: List[str] = []
     table_rows: List[Dict[str, object]] = []
     equipment_info = None
+    facet_counts = None
 
     if search_triggered and data_available:
-        filtered = ds._apply_filters(store.combined, selections)
-        selected_orders = ds._select_order_numbers(filtered, limit_value)
-        table_rows = ds._build_table_rows(filtered, selected_orders)
+        selection_key = ds._selection_key(store, selections)
+        filtered = ds._apply_filters(store, selections)
+        selected_orders = ds._select_order_numbers(filtered, limit_value, selection_key)
+        table_rows = ds._build_table_rows(store, filtered, selected_orders, selection_key)
         total_results = filtered["Order No"].nunique()
+        # 드롭다운 옆에 현재 조건에서의 주문 수 표시 (0건 조합 선택 방지)
+        facet_counts = ds._compute_facet_counts(store, selections)
 
         if selections.get("equipment_no"):
             equipment_matches = filtered[
@@ -78,19 +137,7 @@ def index():
         sub_choices = store.all_sub_options
     sub_options = [""] + sub_choices
 
-    equipment_link_template = url_for(
-        "search.index",
-        middle_category=selections.get("middle_category", ""),
-        order_no="",
-        equipment_name="",
-        top_category="",
-        sub_category="",
-        equipment_no="EQUIPMENT_PLACEHOLDER",
-        # Equipment 클릭 시에는 첨부자료 필터(with_links)를 초기화해 자동 체크를 해제
-        with_links="",
-        search="1",
-        limit=limit_value,
-    )
+    equipment_link_template = _equipment_link_template(selections, limit_value)
 
     base_params = {
         "equipment_no": selections.get("equipment_no", ""),
@@ -106,13 +153,21 @@ def index():
 
     is_limited = total_results > limit_value
     load_more_url = None
+    load_more_rows_url = None
     if is_limited:
         load_params = dict(base_params)
+        load_params["detail_query"] = selections.get("detail_query", "")
         load_params["limit"] = limit_value + ds.DEFAULT_RESULT_LIMIT
         load_more_url = url_for("search.index", **load_params)
+        # JS가 있으면 다음 페이지 행만 받아 표에 이어 붙임 (위 URL은 JS 없을 때 / 커서 만료 시 사용)
+        rows_params = dict(load_params)
+        rows_params["limit"] = limit_value
+        rows_params["cursor"] = _encode_cursor(store.epoch, result_count)
+        load_more_rows_url = url_for("search.search_rows_api", **rows_params)
 
     # Build export URL if we have search results
     export_results_url = None
+    export_jobs_url = None
     if search_triggered and data_available and result_count > 0:
         export_params = {
             "equipment_no": selections.get("equipment_no", ""),
@@ -125,6 +180,7 @@ def index():
             "detail_query": selections.get("detail_query", ""),
         }
         export_results_url = url_for("search.export_search_results", **export_params)
+        export_jobs_url = url_for("search.submit_export_job")
 
     return render_template(
         "search/index.html",
@@ -144,26 +200,94 @@ def index():
         current_dataset_label="전체 데이터 (최신 + 구 SAP)",
         equipment_link_template=equipment_link_template,
         load_more_url=load_more_url,
+        load_more_rows_url=load_more_rows_url,
         equipment_info=equipment_info,
         export_results_url=export_results_url,
+        export_jobs_url=export_jobs_url,
+        facet_counts=facet_counts,
+    )
+
+
+@search_bp.route("/api/search/cache_stats")
+def search_cache_stats_api():
+    """Entry count, byte usage and hit/miss/eviction counters of the search caches."""
+    return jsonify(cache_stats())
+
+
+@search_bp.route("/api/search/rows")
+def search_rows_api():
+    """Next page of result rows after ``cursor`` ("epoch:offset"), rendered as ``<tr>`` HTML.
+
+    Pages are sliced from the ranked order list cached per search, so a page
+    costs the same no matter how deep it is. A cursor from an older dataset
+    epoch gets 409 and the client reloads the page instead.
+    """
+    store = ds._get_data_store()
+    selections = _read_selections()
+    limit_value = ds._resolve_limit(request.args.get("limit"))
+    offset = _cursor_offset(store, request.args.get("cursor"))
+
+    ranked = ds._ranked_order_numbers(store, selections)
+    page_orders = ranked[offset:offset + ds.DEFAULT_RESULT_LIMIT]
+    rows = ds._build_page_rows(store, selections, page_orders)
+    render_rows = get_template_attribute("components/search_rows.html", "render_result_rows")
+    shown = offset + len(page_orders)
+    return jsonify(
+        {
+            "rows_html": str(render_rows(rows, ds.TABLE_COLUMNS, _equipment_link_template(selections, limit_value))),
+            "row_count": len(rows),
+            "shown": shown,
+            "total_results": len(ranked),
+            "next_cursor": _next_cursor(store, shown, len(ranked)),
+        }
     )
 
 
+@search_bp.route("/api/search")
+def search_api():
+    """Search results as compact columns for integrations.
+
+    Accepts the same selection keys as ``index`` plus ``limit`` (page size)
+    and an optional ``cursor`` from a previous response. Repeated strings
+    (작업일자, 설비호기, 작업반) are sent as ``{"dictionary": [...], "codes": [...]}``.
+    """
+    store = ds._get_data_store()
+    selections = _read_selections()
+    limit_value = ds._resolve_limit(request.args.get("limit"))
+    offset = _cursor_offset(store, request.args.get("cursor"), required=False)
+
+    ranked = ds._ranked_order_numbers(store, selections) if not store.combined.empty else []
+    page_orders = ranked[offset:offset + limit_value]
+    rows = ds._build_page_rows(store, selections, page_orders)
+    shown = offset + len(page_orders)
+    return jsonify(
+        {
+            "total_results": len(ranked),
+            "count": len(rows),
+            "next_cursor": _next_cursor(store, shown, len(ranked)),
+            "columns": ds._columnar_rows(rows),
+        }
+    )
+
+
+@search_bp.route("/api/search/facets")
+def search_facets_api():
+    """Distinct order counts per top/middle/sub value for the given search conditions."""
+    store = ds._get_data_store()
+    selections = _read_selections()
+    return jsonify(ds._compute_facet_counts(store, selections))
+
+
 @search_bp.route("/order/<order_no>")
 def order_detail(order_no: str):
     store = ds._get_data_store()
-    combined = store.combined
     target = (order_no or "").strip()
 
-    if not target or combined.empty:
-        abort(404)
-
-    mask = combined["Order No"].astype(str).str.strip() == target
-    if not mask.any():
+    filtered = ds._find_order_rows(store, target)
+    if filtered.empty:
         abort(404)
 
-    filtered = combined[mask]
-    rows = ds._build_table_rows(filtered, [target])
+    rows = ds._build_table_rows(store, filtered, [target])
 
     if not rows:
         abort(404)
@@ -223,18 +347,13 @@ def order_detail(order_no: str):
 @search_bp.route("/api/order/<order_no>/detail")
 def order_detail_api(order_no: str):
     store = ds._get_data_store()
-    combined = store.combined
     target = (order_no or "").strip()
 
-    if not target or combined.empty:
-        abort(404)
-
-    mask = combined["Order No"].astype(str).str.strip() == target
-    if not mask.any():
+    filtered = ds._find_order_rows(store, target)
+    if filtered.empty:
         abort(404)
 
-    filtered = combined[mask]
-    rows = ds._build_table_rows(filtered, [target])
+    rows = ds._build_table_rows(store, filtered, [target])
 
     if not rows:
         abort(404)
@@ -295,18 +414,13 @@ def export_order_excel(order_no: str):
 def export_order_detail(order_no: str):
     """Export modal detail view with specific fields only"""
     store = ds._get_data_store()
-    combined = store.combined
     target = (order_no or "").strip()
 
-    if not target or combined.empty:
-        abort(404)
-
-    mask = combined["Order No"].astype(str).str.strip() == target
-    if not mask.any():
+    filtered = ds._find_order_rows(store, target)
+    if filtered.empty:
         abort(404)
 
-    filtered = combined[mask]
-    rows = ds._build_table_rows(filtered, [target])
+    rows = ds._build_table_rows(store, filtered, [target])
 
     if not rows:
         abort(404)
@@ -377,150 +491,202 @@ def export_order_detail(order_no: str):
     )
 
 
-@search_bp.route("/export", methods=["GET"])
-def export_search_results():
-    import sqlite3
+def _build_search_export(
+    store: ds.DataStore | None,
+    selections: Dict[str, str],
+    all_orders: List[str],
+    full_data: bool,
+    progress: export_jobs.JobProgress | None = None,
+    output: IO[bytes] | None = None,
+) -> Tuple[IO[bytes], str] | None:
+    """Excel file of the ranked result orders ``all_orders`` and its download name (None if nothing to export).
+
+    Shared by ``/export`` and export worker processes (``_run_export_job``).
+    ``store`` is only needed for the formatted export; ``full_data`` reads
+    the orders straight from the database. The file is written to ``output``
+    (a temporary file if omitted).
+    """
     from app import config
 
-    store = ds._get_data_store()
-    data_available = not store.combined.empty
+    if progress is None:
+        progress = export_jobs.JobProgress()
 
-    if not data_available:
-        abort(404)
-
-    selections = {
-        "equipment_no": request.args.get("equipment_no", "").strip(),
-        "order_no": request.args.get("order_no", "").strip(),
-        "equipment_name": request.args.get("equipment_name", "").strip(),
-        "top_category": request.args.get("top_category", "").strip(),
-        "middle_category": request.args.get("middle_category", "").strip(),
-        "sub_category": request.args.get("sub_category", "").strip(),
-        "with_links": request.args.get("with_links", "").strip(),
-        "detail_query": request.args.get("detail_query", "").strip(),
-    }
-
-    filtered = ds._apply_filters(store.combined, selections)
-
-    if filtered.empty:
-        abort(404)
+    if not all_orders:
+        return None
+    progress.update(orders_total=len(all_orders))
 
-    order_count = filtered["Order No"].nunique()
+    def _rows_written(count: int) -> None:
+        progress.update(rows_written=count)
 
-    # Check if full_data parameter is set
-    full_data = request.args.get("full_data", "").strip() == "1"
+    equipment_no = selections.get("equipment_no", "").strip()
 
     if full_data:
         # Export all 54 columns from database directly
-        try:
-            # Get all order numbers (no limit for export)
-            all_orders = ds._select_order_numbers(filtered, limit=order_count)
-
-            if not all_orders:
-                abort(404)
-
-            # Read from database directly
-            db_path = config.SHARED_TOTAL_CSV
-            conn = sqlite3.connect(str(db_path))
-
-            # Create a query for all matching order numbers
-            placeholders = ",".join("?" * len(all_orders))
-            query = f"SELECT * FROM sap_reports WHERE \"Order No\" IN ({placeholders})"
-            export_df = pd.read_sql_query(query, conn, params=all_orders)
-            conn.close()
-
-            if export_df.empty:
-                abort(404)
-
-            # Sort by date (newest first) using same logic as display
-            date_columns = ["Start of Execution", "Bsc start", "Actual Start (Time)", "Required Start"]
-            for date_col in date_columns:
-                if date_col in export_df.columns:
-                    export_df[f"{date_col}_datetime"] = pd.to_datetime(
-                        export_df[date_col], errors="coerce"
-                    )
-
-            # Create a combined date column for sorting (first non-null date)
-            export_df["_sort_date"] = None
-            for date_col in date_columns:
-                dt_col = f"{date_col}_datetime"
-                if dt_col in export_df.columns:
-                    export_df["_sort_date"] = export_df["_sort_date"].fillna(export_df[dt_col])
-
-            # Sort by date descending (newest first), then by Equipment and Order No
-            export_df = export_df.sort_values(
-                by=["_sort_date", "Equipment", "Order No"],
-                ascending=[False, True, True],
-                na_position="last"
-            )
-
-            # Drop temporary sorting columns
-            cols_to_drop = ["_sort_date"] + [f"{dc}_datetime" for dc in date_columns if f"{dc}_datetime" in export_df.columns]
-            export_df = export_df.drop(columns=cols_to_drop)
-
-            # Insert blank rows between different Order Nos
-            export_with_blanks = ds.insert_blank_rows_between_orders(export_df)
-
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                export_with_blanks.to_excel(writer, index=False, sheet_name="Search Results")
-
-                # Format the worksheet for better readability
-                worksheet = writer.sheets["Search Results"]
-                ds.format_excel_worksheet(worksheet, export_with_blanks)
-
-            output.seek(0)
-
-            # Determine filename
-            equipment_no = selections.get("equipment_no", "").strip()
-            if equipment_no:
-                download_name = f"{equipment_no}_full_data.xlsx"
-            else:
-                download_name = "search_results_full_data.xlsx"
-
-            return send_file(
-                output,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                as_attachment=True,
-                download_name=download_name,
-            )
-        except Exception as e:
-            print(f"Error exporting full data: {e}")
-            abort(500)
+        # 주문 번호는 임시 테이블로 조인해 청크 단위로 읽음 (IN (?, ...) 변수 개수 제한 없음)
+        chunks: List[pd.DataFrame] = []
+        seen_orders: Set[str] = set()
+        for chunk in dataset.iter_raw_order_rows(config.SHARED_TOTAL_CSV, all_orders):
+            chunks.append(chunk)
+            seen_orders.update(chunk["Order No"].unique())
+            progress.update(orders_done=len(seen_orders))
+        progress.update(orders_done=len(all_orders))
+
+        export_df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else next(iter(chunks), pd.DataFrame())
+        if export_df.empty:
+            return None
+
+        # Sort by date (newest first) using same logic as display
+        date_columns = ["Start of Execution", "Bsc start", "Actual Start (Time)", "Required Start"]
+        for date_col in date_columns:
+            if date_col in export_df.columns:
+                export_df[f"{date_col}_datetime"] = pd.to_datetime(
+                    export_df[date_col], errors="coerce"
+                )
+
+        # Create a combined date column for sorting (first non-null date)
+        export_df["_sort_date"] = None
+        for date_col in date_columns:
+            dt_col = f"{date_col}_datetime"
+            if dt_col in export_df.columns:
+                export_df["_sort_date"] = export_df["_sort_date"].fillna(export_df[dt_col])
+
+        # Sort by date descending (newest first), then by Equipment and Order No
+        export_df = export_df.sort_values(
+            by=["_sort_date", "Equipment", "Order No"],
+            ascending=[False, True, True],
+            na_position="last"
+        )
+
+        # Drop temporary sorting columns
+        cols_to_drop = ["_sort_date"] + [f"{dc}_datetime" for dc in date_columns if f"{dc}_datetime" in export_df.columns]
+        export_df = export_df.drop(columns=cols_to_drop)
+
+        # Determine filename
+        download_name = f"{equipment_no}_full_data.xlsx" if equipment_no else "search_results_full_data.xlsx"
     else:
         # Normal export (formatted with work details, materials, etc.)
-        # Get all order numbers (no limit for export)
-        all_orders = ds._select_order_numbers(filtered, limit=order_count)
-        table_rows = ds._build_table_rows(filtered, all_orders)
+        # 주문 행은 일정 개수씩 만들어 진행률을 갱신 (결과 행 캐시는 채우지 않음)
+        table_rows: List[Dict[str, object]] = []
+        for start in range(0, len(all_orders), EXPORT_ORDER_BATCH):
+            batch = all_orders[start:start + EXPORT_ORDER_BATCH]
+            table_rows.extend(ds._build_page_rows(store, selections, batch))
+            progress.update(orders_done=start + len(batch))
 
         # Build flattened Excel data
         export_df = ds.build_excel_export_data(table_rows)
 
         if export_df.empty:
-            abort(404)
+            return None
 
-        # Insert blank rows between different Order Nos
-        export_with_blanks = ds.insert_blank_rows_between_orders(export_df)
+        # Determine filename based on Equipment No if available
+        download_name = f"{equipment_no}_search_results.xlsx" if equipment_no else "search_results.xlsx"
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            export_with_blanks.to_excel(writer, index=False, sheet_name="Search Results")
+    # Insert blank rows between different Order Nos
+    export_with_blanks = ds.insert_blank_rows_between_orders(export_df)
 
-            # Format the worksheet for better readability
-            worksheet = writer.sheets["Search Results"]
-            ds.format_excel_worksheet(worksheet, export_with_blanks)
+    # write-only 통합문서를 임시 파일에 쓰고 그대로 스트리밍 (메모리에 전체 xlsx를 만들지 않음)
+    output = excel_export.write_frame(export_with_blanks, "Search Results", progress=_rows_written, output=output)
+    return output, download_name
 
-        output.seek(0)
 
-        # Determine filename based on Equipment No if available
-        equipment_no = selections.get("equipment_no", "").strip()
-        if equipment_no:
-            download_name = f"{equipment_no}_search_results.xlsx"
-        else:
-            download_name = "search_results.xlsx"
+def _run_export_job(
+    progress: export_jobs.JobProgress,
+    output: IO[bytes],
+    selections: Dict[str, str],
+    all_orders: List[str],
+    full_data: bool,
+) -> str:
+    """Export job body; runs in an export worker process and returns the download name.
 
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=download_name,
-        )
+    The worker has no request-serving DataStore: the formatted export loads
+    the prepared snapshot (``ds.load_prepared_store``), ``full_data`` needs none.
+    """
+    store = None if full_data else ds.load_prepared_store()
+    export = _build_search_export(store, selections, all_orders, full_data, progress, output)
+    if export is None:
+        raise ValueError("no rows to export")
+    return export[1]
+
+
+@search_bp.route("/export", methods=["GET"])
+def export_search_results():
+    store = ds._get_data_store()
+    data_available = not store.combined.empty
+
+    if not data_available:
+        abort(404)
+
+    selections = _read_selections()
+
+    # Check if full_data parameter is set
+    full_data = request.args.get("full_data", "").strip() == "1"
+
+    try:
+        export = _build_search_export(store, selections, ds._ranked_order_numbers(store, selections), full_data)
+    except Exception as e:
+        print(f"Error exporting search results: {e}")
+        abort(500)
+
+    if export is None:
+        abort(404)
+
+    output, download_name = export
+    return send_file(
+        output,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        as_attachment=True,
+        download_name=download_name,
+    )
+
+
+@search_bp.route("/api/export_jobs", methods=["POST"])
+def submit_export_job():
+    """Queue a search-result export (same query keys as ``/export``) and return the job id and URLs.
+
+    Only the ranked order numbers and the selections go to the worker process;
+    it builds the rows and the file there (``_run_export_job``).
+    """
+    store = ds._get_data_store()
+    if store.combined.empty:
+        abort(404)
+
+    selections = {key: request.values.get(key, "").strip() for key in ds.FILTER_KEYS}
+    full_data = request.values.get("full_data", "").strip() == "1"
+    all_orders = ds._ranked_order_numbers(store, selections)
+
+    job = export_jobs.submit(
+        _run_export_job, (selections, list(all_orders), full_data), download_name="search_results.xlsx"
+    )
+    return (
+        jsonify(
+            {
+                **job.to_dict(),
+                "status_url": url_for("search.export_job_status", job_id=job.job_id),
+                "download_url": url_for("search.download_export_job", job_id=job.job_id),
+            }
+        ),
+        202,
+    )
+
+
+@search_bp.route("/api/export_jobs/<job_id>")
+def export_job_status(job_id: str):
+    job = export_jobs.get(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job.to_dict())
+
+
+@search_bp.route("/api/export_jobs/<job_id>/download")
+def download_export_job(job_id: str):
+    job = export_jobs.get(job_id)
+    if job is None or job.status == export_jobs.FAILED:
+        abort(404)
+    if job.status != export_jobs.DONE or job.path is None:
+        return jsonify(job.to_dict()), 409
+    return send_file(
+        job.path,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        as_attachment=True,
+        download_name=job.download_name,
+    )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List
+
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+
+
+def estimate_size(value: object) -> int:
+    """Approximate memory held by a cached value, in bytes.
+
+    Arrays and pandas objects report their buffers; containers add their
+    items one level deep. Dicts nested inside containers are counted shallowly
+    because cached result rows are shared with ``DataStore.order_rows``.
+    """
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (pd.Index, pd.Series)):
+        return int(value.memory_usage(deep=False))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(item) if isinstance(item, dict) else estimate_size(item) for item in value
+        )
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(key) + (sys.getsizeof(item) if isinstance(item, dict) else estimate_size(item))
+            for key, item in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by an approximate byte budget.
+
+    Keeps hit/miss/eviction counters so cache behaviour can be inspected at
+    runtime (see ``cache_stats``). Entries larger than the whole budget are
+    not stored.
+    """
+
+    def __init__(self, name: str, max_bytes: int, sizeof: Callable[[object], int] = estimate_size) -> None:
+        self.name = name
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: object = None) -> object:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: object) -> None:
+        size = self._sizeof(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            # 예산을 넘으면 가장 오래 사용되지 않은 항목부터 제거
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_REGISTRY: Dict[str, LRUCache] = {}
+
+
+def register(name: str, max_bytes: int) -> LRUCache:
+    """Create (or return the existing) named cache so its stats are reported by ``cache_stats``."""
+    cache = _REGISTRY.get(name)
+    if cache is None:
+        cache = LRUCache(name, max_bytes)
+        _REGISTRY[name] = cache
+    return cache
+
+
+def cache_stats() -> List[Dict[str, object]]:
+    return [cache.stats() for cache in _REGISTRY.values()]
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.services import dashboard_data as dd
+
+# 대시보드 필터 차트용 사전 집계 큐브 (데이터 epoch마다 한 번 생성)
+# 아래 차원 조합 하나가 셀 하나: 행 건수와 비용/작업시간 합계는 셀에 미리 더해 두고,
+# 고유 Order 건수(nunique)와 Order 첫 행 기준 집계는 (Order, 셀) bridge로 정확히 계산
+CUBE_DIMENSIONS = ["년월", "Grouped Cost Center", "Cost Center Text", "WorkCtr.Text", "Grouped Damage", "Grouped Status"]
+MEASURE_COLUMNS = ["Total Cost", "Labor Cost", "Material Cost", "Other Cost", "Actual Work"]
+COST_COLUMNS = ["Total Cost", "Labor Cost", "Material Cost", "Other Cost"]
+ROW_COUNT = "rows"
+
+TREND_CENTERS = ["복합 3~4호기", "복합 5~6호기", "복합 7~9호기"]
+PIE_EXCLUDED_CENTERS = ["예방정비섹션", "계전섹션", "교육·지원섹션", "기계섹션"]
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.intp)
+
+
+@dataclass
+class DashboardCube:
+    # 셀 차원(정렬된 라벨 코드) + Grouped Work Center 코드 + 행 건수 + 측정값 합계 (index = 셀 번호)
+    cells: pd.DataFrame
+    # 차원별 라벨 (코드 순서 = 정렬 순서라 코드로 groupby해도 결과 순서가 같음)
+    labels: Dict[str, np.ndarray]
+    # 고유 (Order, 셀) 쌍, 원본 행 순서 (Order별 첫 등장 셀이 먼저 옴)
+    bridge_orders: np.ndarray
+    bridge_cells: np.ndarray
+    # 행 -> 셀 / Order 코드 (Equipment 필터용)
+    row_cells: np.ndarray
+    row_orders: np.ndarray
+    equipment_rows: Dict[str, np.ndarray]
+    measures: List[str]
+
+    def slice(self, workctrs: Sequence[str] | None = None, start_ym: str | None = None, end_ym: str | None = None) -> "CubeSlice":
+        """Select the cells of one view (WorkCtr.Text list) and month range."""
+        mask = np.ones(len(self.cells), dtype=bool)
+        if workctrs is not None:
+            mask &= self.isin(self.cells, "WorkCtr.Text", workctrs)
+        if start_ym and end_ym:
+            # 기간 비교는 기존과 같이 "YYYY-MM" 라벨 문자열로
+            months = pd.Index([dd.period_label(m) for m in self.labels["년월"]], dtype=object)
+            mask &= np.asarray((months >= start_ym) & (months <= end_ym))[self.cells["년월"].to_numpy()]
+        return CubeSlice(self, mask)
+
+    def isin(self, frame: pd.DataFrame, column: str, values: Sequence[str]) -> np.ndarray:
+        """Row mask of ``frame`` whose ``column`` label is in ``values``."""
+        return np.asarray(pd.Index(self.labels[column]).isin(values))[frame[column].to_numpy()]
+
+    def decode(self, grouped: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        for col in columns:
+            grouped[col] = self.labels[col][grouped[col].to_numpy()]
+        return grouped
+
+    def rollup(self, cells: pd.DataFrame, keys: List[str], values: str | List[str]) -> pd.DataFrame:
+        """Sum ``values`` over ``keys`` like ``df.groupby(keys)[values].sum().reset_index()``."""
+        return self.decode(cells.groupby(keys)[values].sum().reset_index(), keys)
+
+    def count_orders(self, orders: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """Distinct orders per ``keys`` like ``df.groupby(keys)["Order No"].nunique().reset_index()``."""
+        return self.decode(orders.groupby(keys)["Order No"].nunique().reset_index(), keys)
+
+
+@dataclass
+class CubeSlice:
+    cube: DashboardCube
+    mask: np.ndarray
+
+    @property
+    def cells(self) -> pd.DataFrame:
+        return self.cube.cells[self.mask]
+
+    def orders(self, columns: List[str]) -> pd.DataFrame:
+        """Distinct (Order No, ``columns``) rows of the slice, in original row order.
+
+        ``Order No`` holds order codes, so ``nunique``/``drop_duplicates`` on it
+        give the same answers as on the raw rows.
+        """
+        keep = self.mask[self.cube.bridge_cells]
+        return self._frame(self.cube.bridge_cells[keep], self.cube.bridge_orders[keep], columns)
+
+    def equipment_orders(self, equipment: str, columns: List[str]) -> pd.DataFrame:
+        """Rows of one (normalized) Equipment inside the slice."""
+        positions = self.cube.equipment_rows.get(equipment, _EMPTY_POSITIONS)
+        cells = self.cube.row_cells[positions]
+        keep = self.mask[cells]
+        return self._frame(cells[keep], self.cube.row_orders[positions][keep], columns)
+
+    def _frame(self, cells: np.ndarray, orders: np.ndarray, columns: List[str]) -> pd.DataFrame:
+        frame = pd.DataFrame({col: self.cube.cells[col].to_numpy()[cells] for col in columns})
+        frame["Order No"] = orders
+        return frame
+
+
+def _encode(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Codes into sorted labels; NaN (if any) becomes the last label."""
+    codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=False)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def build_cube(df: pd.DataFrame) -> DashboardCube:
+    """Aggregate the preprocessed dashboard frame into a ``DashboardCube``."""
+    labels: Dict[str, np.ndarray] = {}
+    frame = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    for col in CUBE_DIMENSIONS:
+        frame[col], labels[col] = _encode(df[col].to_numpy())
+
+    row_cells = frame.groupby(CUBE_DIMENSIONS, sort=False).ngroup().to_numpy()
+    _, first_rows = np.unique(row_cells, return_index=True)
+    cell_count = len(first_rows)
+
+    cells = frame.iloc[first_rows].reset_index(drop=True)
+    # Grouped Work Center는 WorkCtr.Text에 종속이라 셀 grain을 늘리지 않음
+    work_center_codes, labels["Grouped Work Center"] = _encode(df["Grouped Work Center"].to_numpy())
+    cells["Grouped Work Center"] = work_center_codes[first_rows]
+    cells[ROW_COUNT] = np.bincount(row_cells, minlength=cell_count)
+    measures = [col for col in MEASURE_COLUMNS if col in df.columns]
+    for col in measures:
+        cells[col] = np.bincount(row_cells, weights=df[col].to_numpy(dtype=float), minlength=cell_count)
+
+    row_orders = pd.factorize(df["Order No"])[0]
+    pair_keys = row_orders.astype(np.int64) * cell_count + row_cells
+    _, first_pairs = np.unique(pair_keys, return_index=True)
+    first_pairs.sort()
+
+    equipment_rows = pd.Series(np.arange(len(df))).groupby(df["Equipment Key"].to_numpy()).indices
+
+    print(f"[dashboard_cube] Built cube: {len(df)} rows -> {cell_count} cells, {len(first_pairs)} order/cell pairs")
+    return DashboardCube(
+        cells=cells,
+        labels=labels,
+        bridge_orders=row_orders[first_pairs],
+        bridge_cells=row_cells[first_pairs],
+        row_cells=row_cells,
+        row_orders=row_orders,
+        equipment_rows=equipment_rows,
+        measures=measures,
+    )
+
+
+# 아래 함수들은 dashboard_data의 같은 이름 함수와 같은 결과를 큐브에서 계산
+
+
+def trend_by_cost_center(view: CubeSlice) -> Dict[str, Any]:
+    cube, cells = view.cube, view.cells
+    cells = cells[cube.isin(cells, "Grouped Cost Center", TREND_CENTERS)]
+    grouped = cube.rollup(cells, ["년월", "Grouped Cost Center"], ROW_COUNT)
+    return dd.trend_chart(grouped.rename(columns={ROW_COUNT: "Order No"}))
+
+
+def damage_trend(view: CubeSlice) -> Dict[str, Any]:
+    # Order별 첫 행의 년월 기준 (drop_duplicates와 동일)
+    first = view.orders(["년월"]).drop_duplicates(subset=["Order No"])
+    grouped = view.cube.decode(first.groupby("년월")["Order No"].count().reset_index(), ["년월"])
+    return dd.damage_trend_chart(grouped)
+
+
+def cost_center_pie(view: CubeSlice) -> Dict[str, Any]:
+    cube, cells = view.cube, view.cells
+    cells = cells[~cube.isin(cells, "Grouped Cost Center", PIE_EXCLUDED_CENTERS)]
+    grouped = cube.rollup(cells, ["Grouped Cost Center"], ROW_COUNT)
+    grouped = grouped[grouped["Grouped Cost Center"].notna()]
+    return dd.ranked_pie_chart(grouped, "Grouped Cost Center", ROW_COUNT)
+
+
+def workctr_pie(view: CubeSlice) -> Dict[str, Any]:
+    grouped = view.cube.rollup(view.cells, ["Grouped Work Center"], ROW_COUNT)
+    grouped = grouped[grouped["Grouped Work Center"].notna() & (grouped["Grouped Work Center"] != "")]
+    return dd.ranked_pie_chart(grouped, "Grouped Work Center", ROW_COUNT)
+
+
+def cost_monthly(view: CubeSlice) -> Dict[str, Any]:
+    if not set(COST_COLUMNS).issubset(view.cube.measures):
+        return dd._chart([], [])
+    return dd.cost_monthly_chart(view.cube.rollup(view.cells, ["년월"], COST_COLUMNS))
+
+
+def cost_monthly_filtered(view: CubeSlice, cost_type: str = "Total Cost") -> Dict[str, Any]:
+    if cost_type not in view.cube.measures:
+        return dd._chart([], [])
+    return dd.cost_monthly_filtered_chart(view.cube.rollup(view.cells, ["년월"], cost_type), cost_type)
+
+
+def workctr_time(view: CubeSlice) -> Dict[str, Any]:
+    grouped = view.cube.count_orders(view.orders(["Grouped Work Center"]), ["Grouped Work Center"])
+    grouped.columns = ["Grouped Work Center", "count"]
+    grouped = grouped[grouped["Grouped Work Center"].notna() & (grouped["Grouped Work Center"] != "")]
+    return dd.ranked_pie_chart(grouped, "Grouped Work Center", "count")
+
+
+def equipment_damage_by_month(view: CubeSlice, equipment: str = "") -> Dict[str, Any]:
+    columns = ["년월", "Grouped Damage"]
+    temp = view.equipment_orders(equipment.strip(), columns) if equipment else view.orders(columns)
+    if temp.empty:
+        return dd._chart([], [])
+    grouped = view.cube.count_orders(temp, columns)
+    grouped.columns = ["년월", "Grouped Damage", "count"]
+    return dd.equipment_damage_month_chart(grouped)
+
+
+def status_by_cost_center(view: CubeSlice) -> Dict[str, Any]:
+    columns = ["Grouped Cost Center", "Grouped Status"]
+    return dd.status_chart(view.cube.count_orders(view.orders(columns), columns))
+
+
+def workctr_order_and_work_comparison(view: CubeSlice, workctrs: List[str], label_map: Dict[str, str] = None) -> Dict[str, Any]:
+    if label_map is None:
+        label_map = {}
+
+    cube, cells = view.cube, view.cells
+    cells = cells[cube.isin(cells, "WorkCtr.Text", workctrs)]
+    if cells.empty:
+        return {
+            "order_count": dd._chart([], []),
+            "actual_work": dd._chart([], []),
+        }
+
+    orders = view.orders(["WorkCtr.Text"])
+    orders = orders[cube.isin(orders, "WorkCtr.Text", workctrs)]
+    order_grouped = cube.count_orders(orders, ["WorkCtr.Text"])
+    order_grouped.columns = ["WorkCtr.Text", "count"]
+    work_grouped = cube.rollup(cells, ["WorkCtr.Text"], "Actual Work")
+    work_grouped.columns = ["WorkCtr.Text", "work"]
+    return dd.workctr_comparison_chart(order_grouped, work_grouped, workctrs, label_map)
+
+
+def cost_by_cost_center(view: CubeSlice, cost_type: str = "Total Cost") -> Dict[str, Any]:
+    cube, cells = view.cube, view.cells
+    cells = cells[cube.isin(cells, "Grouped Cost Center", TREND_CENTERS)]
+    if cells.empty or cost_type not in cube.measures:
+        return dd._chart([], [])
+    grouped = cube.rollup(cells, ["년월", "Grouped Cost Center"], cost_type)
+    return dd.cost_by_cost_center_chart(grouped, cost_type)
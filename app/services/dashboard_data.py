@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List
+
+from app.services import dataset
 
 BASE_COLORS = [
     "rgb(37, 99, 235)",
@@ -16,23 +19,58 @@ BASE_COLORS = [
 
 
 def preprocess(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # 공유 데이터셋 view를 받으므로 컬럼 교체만 하고 전체 복사는 하지 않음
+    df = df.copy(deep=False)
     # Start of Execution이 공란이면 Bsc start 값을 사용
-    # format='mixed'로 다양한 날짜 형식 처리 (YYYY-MM-DD, YYYY-MM-DD HH:MM:SS 등)
-    df["Start of Execution"] = pd.to_datetime(df["Start of Execution"], format="mixed", errors="coerce")
-    df["Bsc start"] = pd.to_datetime(df["Bsc start"], format="mixed", errors="coerce")
+    # format='mixed'와 같은 결과로 다양한 날짜 형식 처리 (고유 문자열만 파싱, dataset.DATE_FORMATS는 빠른 경로)
+    df["Start of Execution"] = dataset.parse_dates(df["Start of Execution"])
+    df["Bsc start"] = dataset.parse_dates(df["Bsc start"])
     df["실행일"] = df["Start of Execution"].fillna(df["Bsc start"])
     df = df.dropna(subset=["실행일"])
-    df["년월"] = df["실행일"].dt.to_period("M").astype(str)
+    # 년월은 YYYYMM 정수 코드 (차트 라벨은 period_label로 "YYYY-MM" 변환)
+    df["년월"] = period_code(df["실행일"])
     df["Order No"] = df["Order No"].astype(str)
 
     numeric_cols = ["Total Cost", "Labor Cost", "Material Cost", "Other Cost", "Actual Work"]
     for col in numeric_cols:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    # 차트 공통 그룹 컬럼은 여기서 한 번만 계산 (고유값에만 매핑 함수 적용)
+    df["Grouped Cost Center"] = map_distinct(df["Cost Center Text"], group_cost_center)
+    df["Grouped Work Center"] = map_distinct(df["WorkCtr.Text"], group_work_center)
+    df["Grouped Damage"] = map_distinct(df["Damage"], group_damage)
+    df["Grouped Status"] = map_distinct(df["Order Status"], group_status)
+    # Equipment 필터용 정규화 번호 (float -> str, 소수점 제거)
+    df["Equipment Key"] = map_distinct(df["Equipment"], normalize_equipment)
     return df
 
 
+def period_code(dates: pd.Series) -> pd.Series:
+    """날짜 -> 년월 코드 (YYYYMM 정수, 정렬 순서가 "YYYY-MM" 문자열과 같음)"""
+    return (dates.dt.year * 100 + dates.dt.month).astype("int32")
+
+
+def period_label(code: int) -> str:
+    """년월 코드 -> "YYYY-MM" 라벨"""
+    return f"{code // 100:04d}-{code % 100:02d}"
+
+
+def _columns(df: pd.DataFrame, columns: List[str], mask: pd.Series = None) -> pd.DataFrame:
+    """집계에 필요한 컬럼만 담은 프레임 (전체 DF 복사 없음, mask가 있으면 해당 행만 복사)"""
+    if mask is None:
+        return pd.DataFrame({col: df[col] for col in columns}, copy=False)
+    return pd.DataFrame({col: df[col][mask] for col in columns}, copy=False)
+
+
+def map_distinct(values: pd.Series, fn: Callable[[Any], Any]) -> np.ndarray:
+    """values의 고유값(NaN 포함)에만 fn을 적용하고 코드로 행 전체에 펼침"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = np.empty(len(uniques), dtype=object)
+    mapped[:] = [fn(value) for value in uniques]
+    return mapped[codes]
+
+
 def group_cost_center(text: str) -> str:
     if pd.isna(text):
         return ""
@@ -98,25 +136,51 @@ def group_damage(text: str) -> str:
     return text
 
 
+def group_status(status: str) -> str:
+    if pd.isna(status):
+        return "진행중"
+    s = str(status).strip().upper()
+    if s in ["CLOSED", "COMPLETE", "CONFIRM", "CNF", "CLOS", "COMP"]:
+        return "완료"
+    return "진행중"
+
+
+def normalize_equipment(value) -> str:
+    """Equipment 번호 정규화 (float -> str, 소수점 제거)"""
+    if pd.isna(value):
+        return ""
+    if str(value).replace('.', '').replace('-', '').isdigit():
+        try:
+            return str(int(float(value)))
+        except ValueError:
+            pass
+    return str(value)
+
+
 def _chart(labels: List[str], series: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {"labels": labels, "datasets": series}
 
 
 def trend_by_cost_center(df: pd.DataFrame) -> Dict[str, Any]:
-    temp = df.copy()
-    temp["Grouped Cost Center"] = temp["Cost Center Text"].apply(group_cost_center)
-
     # Filter to show only specific cost centers
     allowed_centers = ["복합 3~4호기", "복합 5~6호기", "복합 7~9호기"]
-    temp = temp[temp["Grouped Cost Center"].isin(allowed_centers)]
+    mask = df["Grouped Cost Center"].isin(allowed_centers)
+    temp = _columns(df, ["년월", "Grouped Cost Center", "Order No"], mask)
 
     grouped = temp.groupby(["년월", "Grouped Cost Center"])["Order No"].count().reset_index()
-    labels = sorted(grouped["년월"].unique())
+    return trend_chart(grouped)
+
+
+def trend_chart(grouped: pd.DataFrame) -> Dict[str, Any]:
+    """(년월, Grouped Cost Center)별 건수(Order No 컬럼)로 호기별 추이 차트 구성"""
+    months = sorted(grouped["년월"].unique())
+    labels = [period_label(m) for m in months]
     centers = sorted([c for c in grouped["Grouped Cost Center"].unique() if c])
     datasets = []
     for idx, center in enumerate(centers):
         sub = grouped[grouped["Grouped Cost Center"] == center]
-        data = [int(dict(zip(sub["년월"], sub["Order No"])) .get(m, 0)) for m in labels]
+        counts = dict(zip(sub["년월"], sub["Order No"]))
+        data = [int(counts.get(m, 0)) for m in months]
         color = BASE_COLORS[idx % len(BASE_COLORS)]
         datasets.append(
             {
@@ -132,12 +196,16 @@ def trend_by_cost_center(df: pd.DataFrame) -> Dict[str, Any]:
 
 def damage_trend(df: pd.DataFrame) -> Dict[str, Any]:
     """기간별 정비실적 - 월별 Order No 건수합"""
-    temp = df.copy()
-    # Order No 기준 중복 제거하여 고유 건수 계산
-    temp = temp.drop_duplicates(subset=["Order No"])
+    # Order No 기준 중복 제거하여 고유 건수 계산 (Order별 첫 행)
+    temp = _columns(df, ["년월", "Order No"], ~df["Order No"].duplicated())
     grouped = temp.groupby("년월")["Order No"].count().reset_index()
+    return damage_trend_chart(grouped)
+
+
+def damage_trend_chart(grouped: pd.DataFrame) -> Dict[str, Any]:
+    """년월별 고유 Order 건수로 정비실적 차트 구성"""
     grouped = grouped.sort_values("년월")
-    labels = grouped["년월"].tolist()
+    labels = [period_label(m) for m in grouped["년월"]]
     data = grouped["Order No"].astype(int).tolist()
     # 파란색 계열
     datasets = [
@@ -152,40 +220,42 @@ def damage_trend(df: pd.DataFrame) -> Dict[str, Any]:
 
 
 def cost_center_pie(df: pd.DataFrame) -> Dict[str, Any]:
-    # Apply cost center grouping
-    df = df.copy()
-    df["Grouped Cost Center"] = df["Cost Center Text"].apply(group_cost_center)
-
     # Exclude specific cost centers
     exclude_centers = ["예방정비섹션", "계전섹션", "교육·지원섹션", "기계섹션"]
-    df = df[~df["Grouped Cost Center"].isin(exclude_centers)]
+    temp = _columns(df, ["Grouped Cost Center", "Order No"], ~df["Grouped Cost Center"].isin(exclude_centers))
 
     # Group by the grouped cost center
-    grouped = df.groupby("Grouped Cost Center")["Order No"].count().reset_index()
-    grouped = grouped[grouped["Grouped Cost Center"].notna()].sort_values("Order No", ascending=False)
-    labels = grouped["Grouped Cost Center"].tolist()
-    data = grouped["Order No"].astype(int).tolist()
+    grouped = temp.groupby("Grouped Cost Center")["Order No"].count().reset_index()
+    grouped = grouped[grouped["Grouped Cost Center"].notna()]
+    return ranked_pie_chart(grouped, "Grouped Cost Center", "Order No")
+
+
+def ranked_pie_chart(grouped: pd.DataFrame, label_col: str, value_col: str) -> Dict[str, Any]:
+    """집계값 내림차순으로 정렬한 파이 차트 구성"""
+    grouped = grouped.sort_values(value_col, ascending=False)
+    labels = grouped[label_col].tolist()
+    data = grouped[value_col].astype(int).tolist()
     colors = [BASE_COLORS[i % len(BASE_COLORS)].replace("rgb", "rgba").replace(")", ", 0.8)") for i in range(len(labels))]
     return _chart(labels, [{"data": data, "backgroundColor": colors}])
 
 
 def workctr_pie(df: pd.DataFrame) -> Dict[str, Any]:
-    df = df.copy()
-    df["Grouped Work Center"] = df["WorkCtr.Text"].apply(group_work_center)
     grouped = df.groupby("Grouped Work Center")["Order No"].count().reset_index()
-    grouped = grouped[grouped["Grouped Work Center"].notna() & (grouped["Grouped Work Center"] != "")].sort_values("Order No", ascending=False)
-    labels = grouped["Grouped Work Center"].tolist()
-    data = grouped["Order No"].astype(int).tolist()
-    colors = [BASE_COLORS[i % len(BASE_COLORS)].replace("rgb", "rgba").replace(")", ", 0.8)") for i in range(len(labels))]
-    return _chart(labels, [{"data": data, "backgroundColor": colors}])
+    grouped = grouped[grouped["Grouped Work Center"].notna() & (grouped["Grouped Work Center"] != "")]
+    return ranked_pie_chart(grouped, "Grouped Work Center", "Order No")
 
 
 def cost_monthly(df: pd.DataFrame) -> Dict[str, Any]:
     if not {"Total Cost", "Labor Cost", "Material Cost", "Other Cost"}.issubset(df.columns):
         return _chart([], [])
     grouped = df.groupby("년월")[["Total Cost", "Labor Cost", "Material Cost", "Other Cost"]].sum().reset_index()
+    return cost_monthly_chart(grouped)
+
+
+def cost_monthly_chart(grouped: pd.DataFrame) -> Dict[str, Any]:
+    """년월별 비용 합계로 비용 유형별 추이 차트 구성"""
     grouped = grouped.sort_values("년월")
-    labels = grouped["년월"].tolist()
+    labels = [period_label(m) for m in grouped["년월"]]
     series_info = [
         ("Total Cost", "전체비용", "rgb(54, 162, 235)"),
         ("Labor Cost", "인건비", "rgb(255, 99, 132)"),
@@ -219,6 +289,15 @@ def cost_monthly_filtered(df: pd.DataFrame, cost_type: str = "Total Cost") -> Di
     Returns:
         Chart.js 형식 데이터
     """
+    if cost_type not in df.columns:
+        return _chart([], [])
+
+    grouped = df.groupby("년월")[cost_type].sum().reset_index()
+    return cost_monthly_filtered_chart(grouped, cost_type)
+
+
+def cost_monthly_filtered_chart(grouped: pd.DataFrame, cost_type: str) -> Dict[str, Any]:
+    """년월별 cost_type 합계로 단일 비용 추이 차트 구성"""
     cost_labels = {
         "Total Cost": ("전체비용", "rgb(54, 162, 235)"),
         "Labor Cost": ("인건비", "rgb(255, 99, 132)"),
@@ -226,12 +305,8 @@ def cost_monthly_filtered(df: pd.DataFrame, cost_type: str = "Total Cost") -> Di
         "Other Cost": ("기타비용", "rgb(255, 159, 64)"),
     }
 
-    if cost_type not in df.columns:
-        return _chart([], [])
-
-    grouped = df.groupby("년월")[cost_type].sum().reset_index()
     grouped = grouped.sort_values("년월")
-    labels = grouped["년월"].tolist()
+    labels = [period_label(m) for m in grouped["년월"]]
     data = grouped[cost_type].astype(float).round(0).tolist()
 
     label_text, color = cost_labels.get(cost_type, (cost_type, "rgb(128, 128, 128)"))
@@ -248,22 +323,15 @@ def cost_monthly_filtered(df: pd.DataFrame, cost_type: str = "Total Cost") -> Di
 
 
 def workctr_time(df: pd.DataFrame) -> Dict[str, Any]:
-    df = df.copy()
-    df["Grouped Work Center"] = df["WorkCtr.Text"].apply(group_work_center)
     # Order No 기준 건수 (중복 제거)
     grouped = df.groupby("Grouped Work Center")["Order No"].nunique().reset_index()
     grouped.columns = ["Grouped Work Center", "count"]
-    grouped = grouped[grouped["Grouped Work Center"].notna() & (grouped["Grouped Work Center"] != "")].sort_values("count", ascending=False)
-    labels = grouped["Grouped Work Center"].tolist()
-    data = grouped["count"].astype(int).tolist()
-    colors = [BASE_COLORS[i % len(BASE_COLORS)].replace("rgb", "rgba").replace(")", ", 0.8)") for i in range(len(labels))]
-    return _chart(labels, [{"data": data, "backgroundColor": colors}])
+    grouped = grouped[grouped["Grouped Work Center"].notna() & (grouped["Grouped Work Center"] != "")]
+    return ranked_pie_chart(grouped, "Grouped Work Center", "count")
 
 
 def equipment_damage(df: pd.DataFrame, top_n: int = 8) -> Dict[str, Any]:
-    temp = df.copy()
-    temp["Grouped Damage"] = temp["Damage"].apply(group_damage)
-    grouped = temp.groupby(["Equipment", "Grouped Damage"])["Order No"].count().reset_index()
+    grouped = df.groupby(["Equipment", "Grouped Damage"])["Order No"].count().reset_index()
     top_equipment = grouped.groupby("Equipment")["Order No"].sum().nlargest(top_n).index.tolist()
     grouped = grouped[grouped["Equipment"].isin(top_equipment)]
     labels = sorted(grouped["Equipment"].unique())
@@ -288,17 +356,12 @@ def equipment_damage(df: pd.DataFrame, top_n: int = 8) -> Dict[str, Any]:
 
 def equipment_damage_by_month(df: pd.DataFrame, equipment: str = "") -> Dict[str, Any]:
     """Equipment 검색 필터 적용 (정확히 일치), X축을 년월로 표시, Damage별 누적 막대그래프"""
-    temp = df.copy()
-    temp["Grouped Damage"] = temp["Damage"].apply(group_damage)
-
-    # Equipment 컬럼을 문자열로 변환 (float -> str, 소수점 제거)
-    temp["Equipment"] = temp["Equipment"].apply(
-        lambda x: str(int(float(x))) if pd.notna(x) and str(x).replace('.', '').replace('-', '').isdigit() else str(x) if pd.notna(x) else ""
-    )
-
-    # Equipment 필터 적용 (정확히 일치)
+    # Equipment 필터 적용 (정규화된 Equipment Key와 정확히 일치)
+    columns = ["년월", "Grouped Damage", "Order No"]
     if equipment:
-        temp = temp[temp["Equipment"] == equipment.strip()]
+        temp = _columns(df, columns, df["Equipment Key"] == equipment.strip())
+    else:
+        temp = _columns(df, columns)
 
     if temp.empty:
         return _chart([], [])
@@ -306,10 +369,14 @@ def equipment_damage_by_month(df: pd.DataFrame, equipment: str = "") -> Dict[str
     # 년월별, Damage별 Order No 건수 집계 (중복 제거)
     grouped = temp.groupby(["년월", "Grouped Damage"])["Order No"].nunique().reset_index()
     grouped.columns = ["년월", "Grouped Damage", "count"]
+    return equipment_damage_month_chart(grouped)
 
+
+def equipment_damage_month_chart(grouped: pd.DataFrame) -> Dict[str, Any]:
+    """(년월, Grouped Damage)별 고유 Order 건수(count 컬럼)로 누적 막대 차트 구성"""
     # X축 레이블을 "년 월" 형식으로 변환
     sorted_months = sorted(grouped["년월"].unique())
-    labels = [f"{ym[:4]}년 {ym[5:]}월" for ym in sorted_months]
+    labels = [f"{ym // 100:04d}년 {ym % 100:02d}월" for ym in sorted_months]
     damages = sorted([d for d in grouped["Grouped Damage"].unique() if d])
 
     datasets = []
@@ -331,20 +398,13 @@ def equipment_damage_by_month(df: pd.DataFrame, equipment: str = "") -> Dict[str
 
 
 def status_by_cost_center(df: pd.DataFrame) -> Dict[str, Any]:
-    temp = df.copy()
-    def group_status(status):
-        if pd.isna(status):
-            return "진행중"
-        s = str(status).strip().upper()
-        if s in ["CLOSED", "COMPLETE", "CONFIRM", "CNF", "CLOS", "COMP"]:
-            return "완료"
-        return "진행중"
-
-    temp["Grouped Cost Center"] = temp["Cost Center Text"].apply(group_cost_center)
-    temp["Grouped Status"] = temp["Order Status"].apply(group_status)
     # Order No 기준 중복 제거
-    grouped = temp.groupby(["Grouped Cost Center", "Grouped Status"])["Order No"].nunique().reset_index()
+    grouped = df.groupby(["Grouped Cost Center", "Grouped Status"])["Order No"].nunique().reset_index()
+    return status_chart(grouped)
+
 
+def status_chart(grouped: pd.DataFrame) -> Dict[str, Any]:
+    """(Grouped Cost Center, Grouped Status)별 고유 Order 건수로 호기별 진행 현황 차트 구성"""
     # 지정된 4개 호기만 지정된 순서로 표시
     allowed_centers = ["복합 3~4호기", "복합 5~6호기", "복합 7~9호기", "발전호기 공통"]
     centers = [c for c in allowed_centers if c in grouped["Grouped Cost Center"].unique()]
@@ -388,15 +448,15 @@ def workctr_order_and_work_comparison(df: pd.DataFrame, workctrs: List[str], lab
     if label_map is None:
         label_map = {}
 
-    temp = df.copy()
     # 해당 WorkCtr만 필터링
-    temp = temp[temp["WorkCtr.Text"].isin(workctrs)]
+    mask = df["WorkCtr.Text"].isin(workctrs)
 
-    if temp.empty:
+    if not mask.any():
         return {
             "order_count": _chart([], []),
             "actual_work": _chart([], [])
         }
+    temp = _columns(df, ["WorkCtr.Text", "Order No", "Actual Work"], mask)
 
     # Order 건수 (중복 제거)
     order_grouped = temp.groupby("WorkCtr.Text")["Order No"].nunique().reset_index()
@@ -405,7 +465,13 @@ def workctr_order_and_work_comparison(df: pd.DataFrame, workctrs: List[str], lab
     # Actual Work 합계
     work_grouped = temp.groupby("WorkCtr.Text")["Actual Work"].sum().reset_index()
     work_grouped.columns = ["WorkCtr.Text", "work"]
+    return workctr_comparison_chart(order_grouped, work_grouped, workctrs, label_map)
 
+
+def workctr_comparison_chart(
+    order_grouped: pd.DataFrame, work_grouped: pd.DataFrame, workctrs: List[str], label_map: Dict[str, str]
+) -> Dict[str, Any]:
+    """WorkCtr.Text별 고유 Order 건수(count)와 Actual Work 합계(work)로 이중 도넛 데이터 구성"""
     # 직영/상주 레이블 매핑 (직영: 외주업체, 상주: 자체반)
     # 전기반 = 상주, 합자회사 동화-전기 = 직영
     direct_label_map = {
@@ -459,23 +525,27 @@ def cost_by_cost_center(df: pd.DataFrame, cost_type: str = "Total Cost") -> Dict
     Returns:
         Chart.js 형식 데이터
     """
-    temp = df.copy()
-    temp["Grouped Cost Center"] = temp["Cost Center Text"].apply(group_cost_center)
-
     # 지정된 호기만 필터링
     allowed_centers = ["복합 3~4호기", "복합 5~6호기", "복합 7~9호기"]
-    temp = temp[temp["Grouped Cost Center"].isin(allowed_centers)]
+    mask = df["Grouped Cost Center"].isin(allowed_centers)
 
-    if temp.empty or cost_type not in temp.columns:
+    if not mask.any() or cost_type not in df.columns:
         return _chart([], [])
+    temp = _columns(df, ["년월", "Grouped Cost Center", cost_type], mask)
 
     # 년월별, 호기별 비용 합계
     grouped = temp.groupby(["년월", "Grouped Cost Center"])[cost_type].sum().reset_index()
+    return cost_by_cost_center_chart(grouped, cost_type)
+
+
+def cost_by_cost_center_chart(grouped: pd.DataFrame, cost_type: str) -> Dict[str, Any]:
+    """(년월, Grouped Cost Center)별 cost_type 합계로 호기별 비용 차트 구성"""
+    allowed_centers = ["복합 3~4호기", "복합 5~6호기", "복합 7~9호기"]
     grouped = grouped.sort_values("년월")
 
     # X축 레이블 (년월)
     sorted_months = sorted(grouped["년월"].unique())
-    labels = sorted_months
+    labels = [period_label(m) for m in sorted_months]
 
     # 호기별 데이터셋 생성
     center_colors = {
@@ -505,39 +575,39 @@ def cost_by_cost_center(df: pd.DataFrame, cost_type: str = "Total Cost") -> Dict
 
 def get_raw_data(df: pd.DataFrame) -> Dict[str, Any]:
     """필터링을 위한 원본 데이터 반환"""
-    temp = df.copy()
-    temp["Grouped Cost Center"] = temp["Cost Center Text"].apply(group_cost_center)
-    temp["Grouped Damage"] = temp["Damage"].apply(group_damage)
+    months = map_distinct(df["년월"], period_label)
+
+    def records(columns: List[str]) -> List[Dict[str, Any]]:
+        frame = _columns(df, columns)
+        frame["년월"] = months
+        return frame.to_dict("records")
 
     return {
-        "trend": temp[["년월", "Cost Center Text", "Grouped Cost Center", "Order No"]].to_dict("records"),
-        "damage_trend": temp[["년월", "Damage", "Grouped Damage", "Order No"]].to_dict("records"),
-        "cost_center_pie": temp[["년월", "Cost Center Text", "Order No"]].to_dict("records"),
-        "workctr_pie": temp[["년월", "WorkCtr.Text", "Order No"]].to_dict("records"),
-        "cost_chart": temp[["년월", "Total Cost", "Labor Cost", "Material Cost", "Other Cost", "Order No"]].to_dict("records"),
-        "workctr_time": temp[["년월", "WorkCtr.Text", "Actual Work", "Order No"]].to_dict("records"),
-        "equipment_damage": temp[["년월", "Equipment", "Damage", "Grouped Damage", "Order No"]].to_dict("records"),
-        "status_by_cost": temp[["년월", "Cost Center Text", "Grouped Cost Center", "Order Status", "Order No"]].to_dict("records"),
+        "trend": records(["년월", "Cost Center Text", "Grouped Cost Center", "Order No"]),
+        "damage_trend": records(["년월", "Damage", "Grouped Damage", "Order No"]),
+        "cost_center_pie": records(["년월", "Cost Center Text", "Order No"]),
+        "workctr_pie": records(["년월", "WorkCtr.Text", "Order No"]),
+        "cost_chart": records(["년월", "Total Cost", "Labor Cost", "Material Cost", "Other Cost", "Order No"]),
+        "workctr_time": records(["년월", "WorkCtr.Text", "Actual Work", "Order No"]),
+        "equipment_damage": records(["년월", "Equipment", "Damage", "Grouped Damage", "Order No"]),
+        "status_by_cost": records(["년월", "Cost Center Text", "Grouped Cost Center", "Order Status", "Order No"]),
     }
 
 
 def get_filter_options(df: pd.DataFrame) -> Dict[str, Any]:
     """필터링 옵션 반환"""
-    temp = df.copy()
-    temp["Grouped Cost Center"] = temp["Cost Center Text"].apply(group_cost_center)
-
     # Filter to show only specific cost centers in filter options
     allowed_centers = ["복합 3~4호기", "복합 5~6호기", "복합 7~9호기"]
-    filtered_centers = [c for c in temp["Grouped Cost Center"].unique() if c in allowed_centers]
+    filtered_centers = [c for c in df["Grouped Cost Center"].unique() if c in allowed_centers]
 
-    all_months = sorted(temp["년월"].unique().tolist())
+    all_months = [period_label(m) for m in sorted(df["년월"].unique())]
 
     return {
         "cost_centers": sorted(filtered_centers),
-        "cost_centers_raw": sorted([c for c in temp["Cost Center Text"].dropna().unique() if c]),
-        "workctrs": sorted([w for w in temp["WorkCtr.Text"].dropna().unique() if w]),
-        "damages": sorted([d for d in temp["Damage"].dropna().unique() if d]),
-        "equipments": sorted([e for e in temp["Equipment"].dropna().unique() if e]),
+        "cost_centers_raw": sorted([c for c in df["Cost Center Text"].dropna().unique() if c]),
+        "workctrs": sorted([w for w in df["WorkCtr.Text"].dropna().unique() if w]),
+        "damages": sorted([d for d in df["Damage"].dropna().unique() if d]),
+        "equipments": sorted([e for e in df["Equipment"].dropna().unique() if e]),
         "years": sorted(list(set([m[:4] for m in all_months]))),
         "months": [f"{i:02d}" for i in range(1, 13)],
         "min_month": all_months[0] if all_months else "",
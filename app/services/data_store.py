@@ -1,18 +1,32 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterable, List, Sequence, Tuple, Set
 
+import bisect
+import hashlib
 import json
 import math
+import os
+import pickle
 import re
+import threading
+import time
 
 import io
+import numpy as np
 import pandas as pd
 
 from app import config
+from app.services import cache, dataset, search_index
+from app.services.dataset import BASE_REQUIRED_COLUMNS, COLUMN_ALIASES, DB_COLUMN_MAPPINGS
+
+# 한 주문의 행들을 컬럼별 값 배열로 담은 것 (행 순서 유지)
+OrderColumns = Dict[str, Sequence[object]]
+# (dataset epoch, normalized selections): 검색 결과 캐시 공통 키
+SelectionKey = Tuple[int, Tuple[Tuple[str, str], ...]]
 
 DATASETS: Dict[str, Dict[str, object]] = {
     "unified": {
@@ -112,78 +126,29 @@ MIDDLE_CATEGORY_ALIASES_NORMALIZED = {
     for key, value in MIDDLE_CATEGORY_ALIASES.items()
 }
 
-# DB 인코딩 깨진 컬럼명 매핑 (DB가 cp949로 저장되어 UTF-8로 읽을 때 깨짐)
-DB_COLUMN_MAPPINGS: Dict[str, str] = {
-    # 정비실적 관련
-    b'\xec\xa0\x95\xeb\xb9\x84\xec\x8b\xa4\xec\xa0\x81 short text'.decode('utf-8'): "정비실적 short text",
-    b'\xec\xa0\x95\xeb\xb9\x84\xec\x8b\xa4\xec\xa0\x81 long text'.decode('utf-8'): "정비실적 long text",
-    # 작업자 관련
-    b'\xec\x9e\x91\xec\x97\x85\xec\x9e\x90 \xec\x82\xac\xeb\xb2\x88'.decode('utf-8'): "작업자 사번",
-    b'\xec\x9e\x91\xec\x97\x85\xec\x9e\x90 \xec\x9d\xb4\xeb\xa6\x84'.decode('utf-8'): "작업자 이름",
-    # 정비요청 관련
-    b'\xec\xa0\x95\xeb\xb9\x84\xec\x9a\x94\xec\xb2\xad(\xec\x84\xb9\xec\x85\x98)'.decode('utf-8'): "정비요청(섹션)",
-    b'\xec\xa0\x95\xeb\xb9\x84\xec\x9a\x94\xec\xb2\xad(\xec\xa1\xb0)'.decode('utf-8'): "정비요청(조)",
-}
-
-COLUMN_ALIASES: Dict[str, str] = {
-    "Order Long Text": "정비실적 long text",
-    "정비실적 long text": "정비실적 long text",
-    "정비실적 Long Text": "정비실적 long text",
-    "정비실적 Long text": "정비실적 long text",
-    "정비실적  long text": "정비실적 long text",
-    "정비실적_long_text": "정비실적 long text",
-    "정비실적-Long Text": "정비실적 long text",
-    "주요정비실적 Long Text": "정비실적 long text",
-    "주요정비실적 long text": "정비실적 long text",
-    "정비실적LONGTEXT": "정비실적 long text",
-    "정비실적LONG TEXT": "정비실적 long text",
-    "정비 실적 long text": "정비실적 long text",
-    "정비실적\u3000long text": "정비실적 long text",
-    "정비실적\xa0long text": "정비실적 long text",
-    "정비실적\u3000Long Text": "정비실적 long text",
-    "정비실적\xa0Long Text": "정비실적 long text",
-    "정비실적Long Text": "정비실적 long text",
-    "정비실적LongText": "정비실적 long text",
-    "정비실적_Long Text": "정비실적 long text",
-    "정비실적_Long_Text": "정비실적 long text",
-    "정비실적-long text": "정비실적 long text",
-    "정비실적-long-text": "정비실적 long text",
-    "정비실적LONG-TEXT": "정비실적 long text",
-    "정비실적_longtext": "정비실적 long text",
-    "정비실적long text": "정비실적 long text",
-    "정비실적long_text": "정비실적 long text",
-    "정비실적 LONG TEXT": "정비실적 long text",
-    "정비실적 LONG text": "정비실적 long text",
-    "정비실적 LONGText": "정비실적 long text",
-    "정비실적 LONGTEXT": "정비실적 long text",
-    " long text": "정비실적 long text",
-    " long text": "정비실적 long text",
-}
-
 MATERIAL_COLUMN_KEY = "materials"
 
-BASE_REQUIRED_COLUMNS = [
-    "Order No",
-    "Equipment",
-    "Order Short Text",
-    "Loc. Text",
-    "Floc. Text",
-    "WorkCtr.Text",
-    "Cost Center Text",
-    "Object type text",
-    "Confirm text",
-    "정비실적 long text",
-    "Material",
-    "Material Desc.",
-    "Qty",
-    "UoM",
-    "Equi. Text",
-]
-
 DEFAULT_RESULT_LIMIT = 200
 
 URL_ALLOWED_CHARS = r"A-Za-z0-9\-\._~:/?#\[\]@!$&'()*+,;=%"
 URL_PATTERN = re.compile(rf"https?://[{URL_ALLOWED_CHARS}\s]+", re.IGNORECASE)
+# _apply_filters가 사용하는 검색 조건 키 (캐시 키 정규화 순서)
+FILTER_KEYS = (
+    "equipment_no",
+    "order_no",
+    "equipment_name",
+    "top_category",
+    "middle_category",
+    "sub_category",
+    "with_links",
+    "detail_query",
+)
+# 드롭다운 facet(주문 수) 대상: 검색 조건 키 -> 컬럼
+FACET_COLUMNS = {
+    "top_category": "Cost Center Text",
+    "middle_category": "WorkCtrAlias",
+    "sub_category": "Object type text",
+}
 SEARCH_SELECTION_KEYS = ("top_category", "middle_category", "sub_category", "with_links")
 TABLE_COLUMNS = [
     ("dataset_label", "작업일자"),
@@ -197,6 +162,36 @@ TABLE_COLUMNS = [
     ("links", "첨부자료"),
     ("details", "상세내역"),
 ]
+# /api/search 응답 컬럼(주문 행 키)과 그중 값이 반복되어 사전 인코딩하는 컬럼
+SEARCH_API_COLUMNS = (
+    "order_no",
+    "dataset_label",
+    "order_short_text",
+    "equipment",
+    "equi_text",
+    "cost_center",
+    "workctr",
+    "confirm_text",
+    "links",
+    "has_details",
+)
+SEARCH_API_DICTIONARY_COLUMNS = ("dataset_label", "cost_center", "workctr")
+# DataStore.combined에서 category dtype으로 저장하는 저카디널리티 컬럼
+CATEGORICAL_COLUMNS = (
+    "Cost Center Text",
+    "WorkCtr.Text",
+    "WorkCtrAlias",
+    "Object type text",
+    "UoM",
+    "dataset_label",
+    "dataset_key",
+)
+# 설비명(equipment_name) 검색 대상 컬럼; 컬럼별로 모든 단어가 있어야 하고 두 컬럼은 OR
+EQUIPMENT_NAME_COLUMNS = ("Order Short Text", "Equi. Text")
+# 부분 일치(equipment_no, order_no) 검색 대상 컬럼
+SUBSTRING_SEARCH_COLUMNS = ("Equipment", "Order No")
+# 호기/작업반/소분류/링크 필터를 행 위치 색인으로 처리하는 컬럼
+FILTER_INDEX_COLUMNS = ("Cost Center Text", "WorkCtrAlias", "Object type text", "HasLongTextLink")
 SHORT_TEXT_COLUMN = '정비실적 short text'
 WORK_DETAIL_FIELDS = [
     ("start_of_execution", "Start of Execution"),
@@ -204,6 +199,22 @@ WORK_DETAIL_FIELDS = [
     ("actual_work", "Actual Work"),
     ("work_unit", "Unit"),
 ]
+# _build_order_row가 읽는 컬럼
+ORDER_ROW_COLUMNS = (
+    "Order Short Text",
+    "Equipment",
+    "Equi. Text",
+    "WorkCtr.Text",
+    "Cost Center Text",
+    "Confirm text",
+    SHORT_TEXT_COLUMN,
+    "정비실적 long text",
+    "Material",
+    "Material Desc.",
+    "Qty",
+    "UoM",
+    "WorkDateForSort",
+) + tuple(column for _, column in WORK_DETAIL_FIELDS)
 ORDER_INFO_FIELDS = [
     ("Order No", "Order No"),
     ("Equipment", "Equipment"),
@@ -230,17 +241,49 @@ class DataStore:
     sub_by_middle: Dict[str, List[str]]
     sub_by_top: Dict[str, List[str]]
     all_sub_options: List[str]
+    # 스왑 시점에 부여되는 데이터셋 세대 번호; 캐시 키에 사용
+    epoch: int = 0
+    # 데이터셋별 원본 상태 (증분 반영 시 변경 행 조회 기준)
+    sources: Dict[str, dataset.SourceState] = field(default_factory=dict)
+    # Order No별 결과 행(materialized view): 스왑 후 백그라운드에서 채우고, 증분 반영 때 변경되지 않은 주문은 이어받음
+    order_rows: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    # 설비명 검색용 단어 토큰 역색인 (컬럼명 -> TokenIndex, combined 행 위치 기준)
+    token_indexes: Dict[str, search_index.TokenIndex] = field(default_factory=dict)
+    # 설비번호/오더번호 부분 일치 검색용 trigram 색인
+    trigram_indexes: Dict[str, search_index.TrigramIndex] = field(default_factory=dict)
+    # Order No -> 행 위치 (상세 화면에서 전체 테이블 비교 없이 한 주문의 행만 조회)
+    order_index: search_index.KeyIndex | None = None
+    # 분류/링크 필터용 값 -> 행 위치 색인 (FILTER_INDEX_COLUMNS)
+    filter_indexes: Dict[str, search_index.KeyIndex] = field(default_factory=dict)
 
 
 DATA_STORE: DataStore | None = None
-DATASET_MTIMES: Dict[str, float] = {}
+# 마지막으로 반영(시도)한 dataset.data_epoch(); 다르면 백그라운드 재로딩
+_LOADED_DATA_EPOCH = -1
 _CACHE_EPOCH: int = 0
+# 최초 로딩 이후의 재로딩은 요청 스레드가 아닌 백그라운드 스레드에서 수행
+_INITIAL_LOAD_LOCK = threading.Lock()
+_RELOAD_LOCK = threading.Lock()
+_RELOAD_THREAD: threading.Thread | None = None
+# load_prepared_store()가 읽은 (스냅샷 키, store); 요청을 처리하지 않는 export 워커 프로세스에서만 사용
+_PREPARED_STORE: Tuple[str, DataStore] | None = None
+# fingerprints.json 읽기/쓰기 직렬화 (재로딩 스레드와 스냅샷 저장 스레드가 동시에 키를 만들 수 있음)
+_FINGERPRINT_LOCK = threading.Lock()
+# 검색 캐시는 바이트 예산이 있는 LRU (app/services/cache.py); 통계는 /api/search/cache_stats
+_CACHE_BUDGET = config.SEARCH_CACHE_MAX_BYTES
 # Cache filtered index lookups to avoid recomputing heavy filters across identical queries
-_FILTER_CACHE: Dict[Tuple[int, int, Tuple[Tuple[str, str], ...]], pd.Index] = {}
-# Cache selected order numbers by filtered dataframe and limit
-_ORDER_SELECTION_CACHE: Dict[Tuple[int, int, int | None], List[str]] = {}
-# Cache built table rows by filtered dataframe and selected orders
-_TABLE_ROWS_CACHE: Dict[Tuple[int, int, Tuple[str, ...] | None], List[Dict[str, object]]] = {}
+_FILTER_CACHE = cache.register("filter", _CACHE_BUDGET // 4)
+# Cache dropdown facet counts per normalized selection
+_FACET_CACHE = cache.register("facets", _CACHE_BUDGET // 16)
+# Cache selected order numbers by selection key and limit
+_ORDER_SELECTION_CACHE = cache.register("order_selection", _CACHE_BUDGET // 16)
+# Cache built table rows by selection key and selected orders
+_TABLE_ROWS_CACHE = cache.register("table_rows", _CACHE_BUDGET // 2)
+
+# Prepared DataStore snapshot on disk; bump the version whenever DataStore fields
+# or the normalization steps change so stale snapshots are ignored
+SNAPSHOT_VERSION = 13
+SNAPSHOT_DIR: Path = config.SNAPSHOT_DIR
 
 
 def _resolve_limit(raw_value: str | None) -> int:
@@ -264,102 +307,6 @@ def _capture_dataset_mtimes() -> Dict[str, float]:
     return mtimes
 
 
-def _clean_string_series(series: pd.Series) -> pd.Series:
-    return (
-        series.replace({pd.NA: "", "nan": "", "NaN": "", None: ""})
-        .astype(str)
-        .str.strip()
-    )
-
-
-def _apply_column_aliases(df: pd.DataFrame) -> pd.DataFrame:
-    result = df.copy()
-
-    for source, target in COLUMN_ALIASES.items():
-        if source not in result.columns:
-            continue
-        if source == target:
-            continue
-
-        if target in result.columns:
-            source_clean = _clean_string_series(result[source])
-            target_clean = _clean_string_series(result[target])
-            mask = target_clean == ""
-            if mask.any():
-                result.loc[mask, target] = source_clean[mask]
-            result.drop(columns=[source], inplace=True)
-        else:
-            result.rename(columns={source: target}, inplace=True)
-
-    return result
-
-
-def _read_dataset(path: Path) -> pd.DataFrame:
-    print(f"[data_store] _read_dataset called with: {path}")
-    print(f"[data_store] File exists: {path.exists()}, suffix: {path.suffix}")
-
-    if not path.exists():
-        print(f"[data_store] ERROR: File does not exist!")
-        return pd.DataFrame(columns=BASE_REQUIRED_COLUMNS)
-
-    # Check if file is SQLite database
-    if path.suffix.lower() == '.db':
-        print(f"[data_store] Reading SQLite database...")
-        import sqlite3
-        try:
-            conn = sqlite3.connect(str(path))
-            df = pd.read_sql_query("SELECT * FROM sap_reports", conn, dtype=str)
-            conn.close()
-            print(f"[data_store] Loaded {len(df)} rows from database")
-
-            # DB 컬럼명 매핑 적용 (인코딩 깨진 한글 컬럼명 수정)
-            if DB_COLUMN_MAPPINGS:
-                rename_map = {k: v for k, v in DB_COLUMN_MAPPINGS.items() if k in df.columns}
-                if rename_map:
-                    df.rename(columns=rename_map, inplace=True)
-                    print(f"[data_store] Renamed {len(rename_map)} columns: {list(rename_map.values())}")
-        except Exception as exc:
-            print(f"[data_store] ERROR reading database: {exc}")
-            raise RuntimeError(f"Failed to read SQLite database {path}: {exc}")
-    else:
-        # Read CSV file with encoding fallback
-        encodings = ("utf-8-sig", "cp949", "utf-8")
-        last_error: Exception | None = None
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(path, dtype=str, low_memory=False, encoding=encoding)
-                break
-            except UnicodeDecodeError as exc:
-                last_error = exc
-        else:
-            if last_error is not None:
-                raise last_error
-            df = pd.DataFrame(columns=BASE_REQUIRED_COLUMNS)
-
-    df.columns = [str(column).strip() for column in df.columns]
-    if df.columns.duplicated().any():
-        df = df.loc[:, ~df.columns.duplicated()]
-    if COLUMN_ALIASES:
-        df = _apply_column_aliases(df)
-        if df.columns.duplicated().any():
-            df = df.loc[:, ~df.columns.duplicated()]
-
-    df = df.replace({pd.NA: "", "nan": "", "NaN": ""}).fillna("")
-
-    for column in BASE_REQUIRED_COLUMNS:
-        if column not in df.columns:
-            df[column] = ""
-        df[column] = df[column].astype(str).str.strip()
-
-    # Remove decimal points from numeric fields (e.g., 1008483.0 -> 1008483)
-    numeric_fields = ["Order No", "Equipment", "Man", "Actual Duration", "Actual Work", "Material", "Qty", "Noti. No"]
-    for field in numeric_fields:
-        if field in df.columns:
-            df[field] = df[field].astype(str).str.replace(r"\.0$", "", regex=True).str.strip()
-
-    return df
-
-
 def _alias_middle_value(value: str) -> str:
     key = value.strip()
     if not key:
@@ -372,48 +319,46 @@ def _alias_middle_value(value: str) -> str:
 
 
 def _calculate_work_date_for_sort(df: pd.DataFrame) -> pd.Series:
-    """Calculate WorkDateForSort once for all data. Returns a Series indexed by Order No."""
+    """Calculate WorkDateForSort once for all data. Returns a Series indexed by Order No.
+
+    Per order, the smallest date string (time portion removed) of the first
+    date column that has one. Dates are compared through the sorted codes of
+    ``dataset.date_part_codes`` so the per-order minimum is an integer
+    reduction instead of a Python-level string groupby.
+    """
     if df.empty or "Order No" not in df.columns:
         return pd.Series(dtype=str)
 
     # Try date columns in order of preference
     date_columns = ["Start of Execution", "Bsc start", "Actual Start (Time)", "Required Start"]
-    order_dates = pd.Series(index=df["Order No"].unique(), dtype=str)
-    order_dates[:] = ""
+    order_codes, order_index = pd.factorize(df["Order No"], use_na_sentinel=False)
+    order_count = len(order_index)
+    order_dates = np.full(order_count, "", dtype=object)
+    # groupby처럼 Order No가 NaN인 행은 집계에서 제외
+    valid_order = ~pd.isna(order_index)[order_codes]
 
     for col in date_columns:
         if col not in df.columns:
             continue
 
-        # Clean date column
-        date_series = (
-            df[col]
-            .fillna("")
-            .astype(str)
-            .str.strip()
-            .replace({"None": "", "nan": "", "NaN": "", "nat": "", "NaT": ""})
-            .str.split(" ").str[0]  # Remove time portion
-        )
-
+        date_codes, labels = dataset.date_part_codes(df[col])
         # Get rows with valid dates
-        valid_mask = date_series != ""
+        valid_mask = valid_order & (labels != "")[date_codes]
         if not valid_mask.any():
             continue
 
         # Get minimum date per Order No for orders without dates yet
-        temp_df = df[valid_mask][["Order No"]].copy()
-        temp_df["_date"] = date_series[valid_mask]
-        grouped = temp_df.groupby("Order No")["_date"].min()
-
-        # Update only orders that don't have dates yet
-        needs_date = order_dates == ""
-        order_dates[needs_date] = grouped.reindex(order_dates[needs_date].index).fillna("")
+        no_date = len(labels)
+        min_codes = np.full(order_count, no_date, dtype=np.int64)
+        np.minimum.at(min_codes, order_codes[valid_mask], date_codes[valid_mask])
+        update = (order_dates == "") & (min_codes < no_date)
+        order_dates[update] = labels[min_codes[update]]
 
         # If all orders have dates, stop
         if (order_dates != "").all():
             break
 
-    return order_dates
+    return pd.Series(order_dates, index=pd.Index(order_index, dtype=object), dtype=object)
 
 
 def _add_alias_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -434,12 +379,14 @@ def _add_alias_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _select_order_numbers(
-    filtered: pd.DataFrame, limit: int | None = None
+    filtered: pd.DataFrame, limit: int | None = None, selection_key: SelectionKey | None = None
 ) -> List[str]:
-    cache_key = (_CACHE_EPOCH, id(filtered), limit)
-    cached = _ORDER_SELECTION_CACHE.get(cache_key)
-    if cached is not None:
-        return cached
+    # selection_key(_selection_key)가 있어야 캐시 사용. filtered는 요청마다 새 객체라 id()로는 키를 만들 수 없음
+    cache_key = (selection_key, limit)
+    if selection_key is not None:
+        cached = _ORDER_SELECTION_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
 
     if filtered.empty:
         return []
@@ -447,100 +394,57 @@ def _select_order_numbers(
     if limit is None:
         limit = DEFAULT_RESULT_LIMIT
 
-    # Get one row per order with the work date and Order Short Text
-    order_keys = (
-        filtered[["Order No", "OrderNoNumeric", "WorkDateForSort", "Order Short Text"]]
-        .drop_duplicates(subset="Order No", keep="first")
-        .assign(OrderNoNumeric=lambda df: df["OrderNoNumeric"].fillna(-math.inf))
-    )
-
-    # Add priority flag: orders with "도면정보" in Order Short Text get highest priority
-    order_keys["HasDrawingInfo"] = order_keys["Order Short Text"].astype(str).str.contains("도면정보", case=False, na=False)
-
-    # Separate into three groups: with drawing info, with dates, without dates
-    has_drawing_info = order_keys["HasDrawingInfo"]
-    drawing_orders = order_keys[has_drawing_info].copy()
-    non_drawing_orders = order_keys[~has_drawing_info].copy()
-
-    # Sort drawing info orders by date (descending), then by order number
-    if not drawing_orders.empty:
-        has_date_drawing = drawing_orders["WorkDateForSort"] != ""
-        with_dates_drawing = drawing_orders[has_date_drawing].copy()
-        without_dates_drawing = drawing_orders[~has_date_drawing].copy()
-
-        if not with_dates_drawing.empty:
-            with_dates_drawing = with_dates_drawing.sort_values(
-                by=["WorkDateForSort", "OrderNoNumeric", "Order No"],
-                ascending=[False, False, False]
-            )
-        if not without_dates_drawing.empty:
-            without_dates_drawing = without_dates_drawing.sort_values(
-                by=["OrderNoNumeric", "Order No"],
-                ascending=[False, False]
-            )
-
-        if not with_dates_drawing.empty and not without_dates_drawing.empty:
-            drawing_orders = pd.concat([with_dates_drawing, without_dates_drawing], ignore_index=True)
-        elif not with_dates_drawing.empty:
-            drawing_orders = with_dates_drawing
-        else:
-            drawing_orders = without_dates_drawing
-
-    # Sort non-drawing orders by date (descending), then by order number
-    if not non_drawing_orders.empty:
-        has_date = non_drawing_orders["WorkDateForSort"] != ""
-        with_dates = non_drawing_orders[has_date].copy()
-        without_dates = non_drawing_orders[~has_date].copy()
-
-        if not with_dates.empty:
-            with_dates = with_dates.sort_values(
-                by=["WorkDateForSort", "OrderNoNumeric", "Order No"],
-                ascending=[False, False, False]
-            )
-        if not without_dates.empty:
-            without_dates = without_dates.sort_values(
-                by=["OrderNoNumeric", "Order No"],
-                ascending=[False, False]
-            )
-
-        if not with_dates.empty and not without_dates.empty:
-            non_drawing_orders = pd.concat([with_dates, without_dates], ignore_index=True)
-        elif not with_dates.empty:
-            non_drawing_orders = with_dates
-        else:
-            non_drawing_orders = without_dates
-
-    # Combine: drawing info orders first, then other orders
-    if not drawing_orders.empty and not non_drawing_orders.empty:
-        combined = pd.concat([drawing_orders, non_drawing_orders], ignore_index=True)
-    elif not drawing_orders.empty:
-        combined = drawing_orders
+    # 정렬 키는 로딩 시 계산한 전역 순위(OrderRank) + 도면정보 여부뿐이므로 재정렬 없이 top-N만 선택.
+    # 도면정보 여부는 기존과 같이 결과 집합에서 주문의 첫 행 기준
+    ranks = filtered["OrderRank"].to_numpy()
+    _, first_rows = np.unique(ranks, return_index=True)
+    order_ranks = ranks[first_rows].astype(np.int64)
+    drawing = filtered["HasDrawingInfo"].to_numpy()[first_rows]
+    sort_keys = np.where(drawing, order_ranks, order_ranks + int(order_ranks.max()) + 1)
+
+    if limit < len(sort_keys):
+        top = np.argpartition(sort_keys, limit - 1)[:limit]
+        top = top[np.argsort(sort_keys[top])]
     else:
-        combined = non_drawing_orders
+        top = np.argsort(sort_keys)
 
-    result = combined["Order No"].head(limit).tolist()
-    _ORDER_SELECTION_CACHE[cache_key] = result
+    result = filtered["Order No"].to_numpy()[first_rows[top]].tolist()
+    if selection_key is not None:
+        _ORDER_SELECTION_CACHE.set(cache_key, result)
     return result
 
 
-def _initialize_data() -> DataStore:
-    frames: List[pd.DataFrame] = []
-
-    for dataset_key, config in DATASETS.items():
-        df = _read_dataset(config["path"])
-        if df.empty:
-            continue
-        df["dataset_key"] = dataset_key
-        df["dataset_label"] = config["label"]
-        df = _add_alias_columns(df)
-        frames.append(df)
-
-    if frames:
-        combined = pd.concat(frames, ignore_index=True)
-    else:
-        combined = pd.DataFrame(columns=BASE_REQUIRED_COLUMNS + ["dataset_key", "dataset_label"])
-        combined = _add_alias_columns(combined)
-
+def _compute_order_ranks(combined: pd.DataFrame, order_index: search_index.KeyIndex) -> np.ndarray:
+    """Per-row global rank of its order: dated orders first, then WorkDateForSort, OrderNoNumeric, Order No (all descending)."""
+    if combined.empty:
+        return np.empty(0, dtype=np.int64)
+    first_rows = order_index.row_order[order_index.row_offsets[:-1]]
+    orders = combined[["Order No", "OrderNoNumeric", "WorkDateForSort"]].iloc[first_rows]
+    orders = orders.assign(
+        OrderNoNumeric=orders["OrderNoNumeric"].fillna(-math.inf),
+        HasDate=orders["WorkDateForSort"] != "",
+    ).reset_index(drop=True)
+    ordered = orders.sort_values(
+        by=["HasDate", "WorkDateForSort", "OrderNoNumeric", "Order No"],
+        ascending=[False, False, False, False],
+    ).index.to_numpy()
+    rank_by_code = np.empty(len(ordered), dtype=np.int64)
+    rank_by_code[ordered] = np.arange(len(ordered))
+    return rank_by_code[order_index.row_codes]
+
+
+def _prepare_frame(df: pd.DataFrame, dataset_key: str, dataset_config: Dict[str, object]) -> pd.DataFrame:
+    df["dataset_key"] = dataset_key
+    df["dataset_label"] = dataset_config["label"]
+    return _add_alias_columns(df)
+
+
+def _finalize_rows(combined: pd.DataFrame) -> pd.DataFrame:
+    """Add per-order WorkDateForSort and drop orders without any content.
+
+    Everything here is computed per Order No, so it can run on just the rows of
+    the orders touched by a delta ingest.
+    """
     # Calculate WorkDateForSort once for all data
     if not combined.empty:
         print("[data_store] Calculating WorkDateForSort...")
@@ -580,19 +484,38 @@ def _initialize_data() -> DataStore:
     if "Order No" in combined.columns:
         # Order is valid if ANY row in that order has required data
         order_has_data = has_required_data.groupby(combined["Order No"]).transform("any")
-        combined = combined[order_has_data].copy()
-    else:
+        if not order_has_data.all():
+            combined = combined[order_has_data].copy()
+    elif not has_required_data.all():
         combined = combined[has_required_data].copy()
 
+    return combined
+
+
+def _encode_categorical_columns(combined: pd.DataFrame) -> pd.DataFrame:
+    # 값 종류가 적은 컬럼은 category(정수 코드 + 값 사전)로 보관 → 메모리 절감, 동등 비교는 코드 비교로 처리됨
+    for column in CATEGORICAL_COLUMNS:
+        if column in combined.columns and not isinstance(combined[column].dtype, pd.CategoricalDtype):
+            combined[column] = combined[column].astype("category")
+    return combined
+
+
+def _has_drawing_info(frame: pd.DataFrame) -> pd.Series:
+    return frame["Order Short Text"].astype(str).str.contains("도면정보", case=False, na=False)
+
+
+def _build_options(combined: pd.DataFrame) -> Dict[str, object]:
+    """Dropdown option fields of ``DataStore`` (호기/중분류/소분류 tree) for ``combined``."""
+    # 값 정리(strip 등)는 행 전체가 아니라 고유값에만 적용
     top_candidates = (
-        combined["Cost Center Text"].astype(str).str.strip().replace({"nan": "", "NaN": ""})
+        pd.Series(combined["Cost Center Text"].unique()).astype(str).str.strip().replace({"nan": "", "NaN": ""})
     )
     # Exclude both EXCLUDED_TOP_CATEGORIES and hidden categories from mappings
     excluded_set = EXCLUDED_TOP_CATEGORIES | _TOP_HIDDEN_CATEGORIES
     all_top_values = sorted(
         {
             value
-            for value in top_candidates
+            for value in top_candidates.unique()
             if value and value not in excluded_set
         }
     )
@@ -623,41 +546,39 @@ def _initialize_data() -> DataStore:
         if item not in priority_items:
             top_options.append(item)
 
+    # 호기 × 중분류 × 소분류 조합을 한 번에 추려서 트리 구성 (호기마다 전체 행을 스캔하지 않음)
+    tree_columns = ["Cost Center Text", "WorkCtrAlias", "Object type text"]
+    triples = combined[tree_columns].drop_duplicates()
+    valid_tops = {top for top in top_options if not top.startswith("─")}
+    alias_sets: Dict[str, set[str]] = {}
+    sub_sets: Dict[Tuple[str, str], set[str]] = {}
+    for top, alias, sub in triples.itertuples(index=False, name=None):
+        if top not in valid_tops or pd.isna(alias):
+            continue
+        alias = str(alias).strip()
+        if not alias:
+            continue
+        alias_sets.setdefault(top, set()).add(alias)
+        sub = "" if pd.isna(sub) else str(sub).strip()
+        if sub:
+            sub_sets.setdefault((top, alias), set()).add(sub)
+
     middle_options: Dict[str, List[str]] = {}
     all_middle_set: set[str] = set()
     sub_by_middle: Dict[str, set[str]] = {}
     sub_by_top: Dict[str, set[str]] = {}
+    sub_options: Dict[Tuple[str, str], List[str]] = {}
 
     for top in top_options:
         if top.startswith("─"):  # Skip separator lines
             continue
-        aliases = (
-            combined.loc[combined["Cost Center Text"] == top, "WorkCtrAlias"]
-            .dropna()
-            .astype(str)
-            .str.strip()
-        )
-        alias_list = sorted({alias for alias in aliases if alias})
+        alias_list = sorted(alias_sets.get(top, set()))
         middle_options[top] = alias_list
         all_middle_set.update(alias_list)
 
-    sub_options: Dict[Tuple[str, str], List[str]] = {}
-    for top in top_options:
-        if top.startswith("─"):  # Skip separator lines
-            continue
         top_subs: set[str] = set()
-        for alias in middle_options.get(top, []):
-            sub_vals = (
-                combined.loc[
-                    (combined["Cost Center Text"] == top)
-                    & (combined["WorkCtrAlias"] == alias),
-                    "Object type text",
-                ]
-                .dropna()
-                .astype(str)
-                .str.strip()
-            )
-            clean_subs = {value for value in sub_vals if value}
+        for alias in alias_list:
+            clean_subs = sub_sets.get((top, alias), set())
             sub_options[(top, alias)] = sorted(clean_subs)
             if clean_subs:
                 sub_by_middle.setdefault(alias, set()).update(clean_subs)
@@ -668,41 +589,511 @@ def _initialize_data() -> DataStore:
     all_sub_options = sorted(
         {
             value
-            for value in combined["Object type text"].astype(str).str.strip()
+            for value in pd.Series(combined["Object type text"].unique()).astype(str).str.strip()
             if value
         }
     )
-    sub_by_middle_lists = {alias: sorted(values) for alias, values in sub_by_middle.items()}
-    sub_by_top_lists = {top: sorted(values) for top, values in sub_by_top.items()}
+    return {
+        "top_options": top_options,
+        "middle_options": middle_options,
+        "sub_options": sub_options,
+        "all_middle_options": all_middle_options,
+        "sub_by_middle": {alias: sorted(values) for alias, values in sub_by_middle.items()},
+        "sub_by_top": {top: sorted(values) for top, values in sub_by_top.items()},
+        "all_sub_options": all_sub_options,
+    }
+
+
+def _build_store(combined: pd.DataFrame) -> DataStore:
+    combined = _encode_categorical_columns(combined)
+    options = _build_options(combined)
+
+    token_indexes = {
+        column: search_index.TokenIndex.build(combined[column], _extract_word_tokens)
+        for column in EQUIPMENT_NAME_COLUMNS
+        if column in combined.columns
+    }
+    trigram_indexes = {
+        column: search_index.TrigramIndex.build(combined[column])
+        for column in SUBSTRING_SEARCH_COLUMNS
+        if column in combined.columns
+    }
+
+    order_index = search_index.KeyIndex.build(combined["Order No"]) if "Order No" in combined.columns else None
+    if order_index is not None:
+        # 결과 정렬용 전역 순위와 행별 도면정보 여부 (_select_order_numbers에서 사용)
+        combined["OrderRank"] = _compute_order_ranks(combined, order_index)
+        combined["HasDrawingInfo"] = _has_drawing_info(combined)
+    filter_indexes = {
+        column: search_index.KeyIndex.build(combined[column])
+        for column in FILTER_INDEX_COLUMNS
+        if column in combined.columns
+    }
 
     return DataStore(
         combined=combined,
-        top_options=top_options,
-        middle_options=middle_options,
-        sub_options=sub_options,
-        all_middle_options=all_middle_options,
-        sub_by_middle=sub_by_middle_lists,
-        sub_by_top=sub_by_top_lists,
-        all_sub_options=all_sub_options,
+        **options,
+        token_indexes=token_indexes,
+        trigram_indexes=trigram_indexes,
+        order_index=order_index,
+        filter_indexes=filter_indexes,
     )
 
 
-def _get_data_store() -> DataStore:
-    global DATA_STORE, _CACHE_EPOCH
-    current_mtimes = _capture_dataset_mtimes()
-    needs_reload = DATA_STORE is None or any(
-        DATASET_MTIMES.get(key) != mtime for key, mtime in current_mtimes.items()
+def _initialize_data() -> DataStore:
+    frames: List[pd.DataFrame] = []
+    sources: Dict[str, dataset.SourceState] = {}
+
+    for dataset_key, config in DATASETS.items():
+        # 대시보드와 같은 정규화 프레임을 공유; 새 컬럼은 view에만 추가됨
+        snapshot = dataset.get_snapshot(config["path"])
+        state = dataset.source_state(snapshot.path, snapshot.frame, snapshot.mtime)
+        if state is not None:
+            sources[dataset_key] = state
+        df = snapshot.view()
+        if df.empty:
+            continue
+        frames.append(_prepare_frame(df, dataset_key, config))
+
+    if len(frames) == 1:
+        # 데이터셋이 하나면 concat으로 전체를 다시 복사하지 않음
+        combined = frames[0]
+    elif frames:
+        combined = pd.concat(frames, ignore_index=True)
+    else:
+        combined = pd.DataFrame(columns=BASE_REQUIRED_COLUMNS + ["dataset_key", "dataset_label"])
+        combined = _add_alias_columns(combined)
+
+    store = _build_store(_finalize_rows(combined))
+    store.sources = sources
+    return store
+
+
+def _merge_order_ranks(
+    store: DataStore, combined: pd.DataFrame, source: np.ndarray, order_index: search_index.KeyIndex
+) -> np.ndarray:
+    """Per-row OrderRank of a patched ``combined`` without re-sorting every order.
+
+    Orders carried over from ``store`` keep their relative order; only the
+    re-read orders are sorted (same keys as ``_compute_order_ranks``) and
+    binary-searched into the carried sequence.
+    """
+    old_index = store.order_index
+    old_first = old_index.row_order[old_index.row_offsets[:-1]]
+    old_codes_by_rank = np.argsort(store.combined["OrderRank"].to_numpy()[old_first], kind="stable")
+
+    # 주문은 전부 이어받거나 전부 다시 읽으므로 첫 행의 source로 구분
+    first_rows = order_index.row_order[order_index.row_offsets[:-1]]
+    first_source = source[first_rows]
+    carried = first_source >= 0
+    new_code_of_old = np.full(len(old_index.keys), -1, dtype=np.int64)
+    new_code_of_old[old_index.row_codes[first_source[carried]]] = np.flatnonzero(carried)
+    carried_by_rank = new_code_of_old[old_codes_by_rank]
+    carried_by_rank = carried_by_rank[carried_by_rank >= 0]
+
+    orders = combined[["Order No", "OrderNoNumeric", "WorkDateForSort"]].iloc[first_rows]
+    order_nos = orders["Order No"].to_numpy()
+    numerics = orders["OrderNoNumeric"].fillna(-math.inf).to_numpy()
+    dates = orders["WorkDateForSort"].to_numpy()
+
+    def _sort_key(code: int) -> Tuple[bool, str, float, str]:
+        return (dates[code] != "", dates[code], numerics[code], order_nos[code])
+
+    # 순위는 정렬 키의 내림차순: 뒤에서부터 보면 오름차순이라 bisect 사용
+    carried_count = len(carried_by_rank)
+    added = sorted(np.flatnonzero(~carried).tolist(), key=_sort_key, reverse=True)
+    ahead = np.asarray(
+        [
+            carried_count
+            - bisect.bisect_left(
+                range(carried_count),
+                _sort_key(code),
+                key=lambda i: _sort_key(carried_by_rank[carried_count - 1 - i]),
+            )
+            for code in added
+        ],
+        dtype=np.int64,
     )
+    rank_by_code = np.empty(len(first_rows), dtype=np.int64)
+    rank_by_code[np.asarray(added, dtype=np.int64)] = ahead + np.arange(len(added))
+    rank_by_code[carried_by_rank] = np.arange(carried_count) + np.searchsorted(
+        ahead, np.arange(carried_count), side="right"
+    )
+    return rank_by_code[order_index.row_codes]
 
-    if needs_reload:
-        DATA_STORE = _initialize_data()
-        DATASET_MTIMES.clear()
-        DATASET_MTIMES.update(current_mtimes)
-        _CACHE_EPOCH += 1
-        _FILTER_CACHE.clear()
-        _ORDER_SELECTION_CACHE.clear()
-        _TABLE_ROWS_CACHE.clear()
-    return DATA_STORE
+
+def _patch_store(store: DataStore, combined: pd.DataFrame, source: np.ndarray) -> DataStore:
+    """Store for ``combined`` built by patching ``store``'s indexes instead of rebuilding them.
+
+    ``source[i]`` is the row position in ``store.combined`` that row ``i``
+    was carried from, or -1 for a re-read row. Only re-read values are
+    factorized/tokenized; OrderRank is merged (``_merge_order_ranks``).
+    """
+    token_indexes = {
+        column: index.patch(combined[column], source, _extract_word_tokens)
+        for column, index in store.token_indexes.items()
+    }
+    trigram_indexes = {
+        column: index.patch(combined[column], source) for column, index in store.trigram_indexes.items()
+    }
+    order_index = store.order_index.patch(combined["Order No"], source)
+    combined["OrderRank"] = _merge_order_ranks(store, combined, source, order_index)
+    filter_indexes = {
+        column: index.patch(combined[column], source) for column, index in store.filter_indexes.items()
+    }
+    return DataStore(
+        combined=combined,
+        **_build_options(combined),
+        token_indexes=token_indexes,
+        trigram_indexes=trigram_indexes,
+        order_index=order_index,
+        filter_indexes=filter_indexes,
+    )
+
+
+def _merge_delta_rows(
+    combined: pd.DataFrame, removed: np.ndarray, rows: pd.DataFrame
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Replace the rows at ``removed`` with ``rows``, keeping ROWID order.
+
+    Returns the merged frame and its ``source`` array for ``_patch_store``.
+    """
+    # 기존 store.combined는 이전 세대 요청이 계속 쓰므로 얕은 복사본의 컬럼만 교체
+    base = combined.copy(deep=False)
+    # category 컬럼은 기존 값 + 새 값의 정렬된 사전으로 맞춰 concat 후에도 category 유지 (전체 빌드와 같은 사전)
+    for column in CATEGORICAL_COLUMNS:
+        if column in base.columns and isinstance(base[column].dtype, pd.CategoricalDtype):
+            categories = base[column].cat.categories.union(pd.Index(rows[column].dropna().unique()))
+            base[column] = base[column].cat.set_categories(categories)
+            rows[column] = pd.Categorical(rows[column], categories=categories)
+    rows["OrderRank"] = np.zeros(len(rows), dtype=np.int64)
+    rows["HasDrawingInfo"] = _has_drawing_info(rows)
+
+    merged = pd.concat([base, rows], ignore_index=True)
+    keep = np.ones(len(merged), dtype=bool)
+    keep[removed] = False
+    positions = np.flatnonzero(keep)
+    order = positions[np.argsort(merged[dataset.ROWID_COLUMN].to_numpy()[positions], kind="stable")]
+    merged = merged.take(order)
+    merged.index = pd.RangeIndex(len(merged))
+    for column in CATEGORICAL_COLUMNS:
+        if column in merged.columns and isinstance(merged[column].dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].cat.remove_unused_categories()
+    return merged, np.where(order < len(combined), order, -1)
+
+
+def _build_delta_store(store: DataStore) -> DataStore | None:
+    """Patch ``store`` with only the orders whose rows changed in the SQLite source.
+
+    The touched orders' rows are re-read and merged into ``combined``, and
+    the search indexes are patched for those rows only (``_patch_store``).
+    Returns ``None`` when the change cannot be applied incrementally (several
+    datasets, CSV source, schema change, deleted rows, ...); callers then fall
+    back to the snapshot or a full rebuild.
+    """
+    if len(DATASETS) != 1 or store.order_index is None:
+        return None
+    dataset_key, dataset_config = next(iter(DATASETS.items()))
+    state = store.sources.get(dataset_key)
+    if state is None:
+        return None
+
+    combined = store.combined
+    rowids = combined[dataset.ROWID_COLUMN]
+
+    def _known_orders(changed_rowids: List[int]) -> List[str]:
+        # 수정된 행이 원래 속했던 주문도 다시 읽어야 주문 이동이 반영됨
+        if not changed_rowids:
+            return []
+        return combined.loc[rowids.isin(changed_rowids), "Order No"].unique().tolist()
+
+    path = Path(dataset_config["path"])
+    delta = dataset.read_delta(path, state, _known_orders)
+    if delta is None:
+        return None
+    new_state, touched, rows = delta
+    print(f"[data_store] Delta ingest: {len(touched)} orders, {len(rows)} rows re-read")
+
+    dataset.apply_delta(path, state.mtime, new_state.mtime, touched, rows)
+    if not touched:
+        return replace(store, sources={dataset_key: new_state}, order_rows=dict(store.order_rows))
+
+    rows = _finalize_rows(_prepare_frame(rows.copy(deep=False), dataset_key, dataset_config))
+    removed = store.order_index.positions_any(list(touched))
+    patched = _patch_store(store, *_merge_delta_rows(combined, removed, rows))
+    patched.sources = {dataset_key: new_state}
+    # 변경되지 않은 주문의 결과 행은 그대로 이어받음
+    patched.order_rows = {
+        order_no: row for order_no, row in store.order_rows.items() if order_no not in touched
+    }
+    return patched
+
+
+def _dataset_fingerprints() -> List[Tuple[int, float, str]]:
+    """(size, mtime, content hash) of every dataset file, in ``DATASETS`` order.
+
+    The last fingerprints are kept next to the snapshots, so a file is only
+    hashed again when its size or mtime changed (not on every start).
+    """
+    path = SNAPSHOT_DIR / "fingerprints.json"
+    with _FINGERPRINT_LOCK:
+        try:
+            known = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            known = {}
+        current: Dict[str, List[object]] = {}
+        for dataset_config in DATASETS.values():
+            source = str(dataset_config["path"])
+            previous = known.get(source)
+            fingerprint = dataset.file_fingerprint(
+                Path(source), known=tuple(previous) if isinstance(previous, list) and len(previous) == 3 else None
+            )
+            current[source] = list(fingerprint)
+        if current != known:
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_text(json.dumps(current, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp_path, path)
+            except OSError as exc:
+                print(f"[data_store] 파일 지문 저장 실패: {exc}")
+    return [tuple(current[str(dataset_config["path"])]) for dataset_config in DATASETS.values()]
+
+
+def _snapshot_key() -> str:
+    """Key the snapshot by every dataset file's size, mtime and content hash."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{SNAPSHOT_VERSION}|pandas {pd.__version__}".encode("utf-8"))
+    for key, (size, mtime, content_hash) in zip(DATASETS, _dataset_fingerprints()):
+        digest.update(f"|{key}|{size}|{mtime}|{content_hash}".encode("utf-8"))
+    # 호기 숨김/포함 매핑도 top_options 구성에 반영되므로 키에 포함
+    mappings = [sorted(_TOP_HIDDEN_CATEGORIES), _TOP_CATEGORY_INCLUDES]
+    digest.update(json.dumps(mappings, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _dataset_rows(store: DataStore, dataset_key: str) -> pd.DataFrame:
+    combined = store.combined
+    if len(DATASETS) == 1:
+        return combined
+    return combined[combined["dataset_key"] == dataset_key]
+
+
+def _dropped_source_rows(store: DataStore) -> Dict[str, pd.DataFrame]:
+    """Rows of each shared dataset frame that ``_finalize_rows`` left out of ``store.combined``.
+
+    Saved with the snapshot so that loading it can restore the shared frame
+    (``_seed_datasets``) instead of the dashboard reading the file again.
+    """
+    dropped: Dict[str, pd.DataFrame] = {}
+    for dataset_key, state in store.sources.items():
+        snapshot = dataset.peek_snapshot(DATASETS[dataset_key]["path"])
+        if snapshot is None or snapshot.mtime != state.mtime:
+            continue
+        frame = snapshot.frame
+        kept = _dataset_rows(store, dataset_key)[dataset.ROWID_COLUMN]
+        dropped[dataset_key] = frame[~frame[dataset.ROWID_COLUMN].isin(kept)]
+    return dropped
+
+
+def _seed_datasets(store: DataStore, dropped: Dict[str, pd.DataFrame]) -> None:
+    """Rebuild the shared dataset frames from a loaded store plus its dropped rows."""
+    for dataset_key, extra in dropped.items():
+        state = store.sources.get(dataset_key)
+        if state is None:
+            continue
+        rows = _dataset_rows(store, dataset_key)
+        # category로 바꾼 컬럼은 원래(object) 값으로 되돌림
+        columns = {
+            column: rows[column].astype(object) if isinstance(rows[column].dtype, pd.CategoricalDtype) else rows[column]
+            for column in extra.columns
+        }
+        frame = pd.concat([pd.DataFrame(columns, copy=False), extra], ignore_index=True)
+        rowids = frame[dataset.ROWID_COLUMN].to_numpy()
+        if len(rowids) and (np.diff(rowids) < 0).any():
+            frame = frame.take(np.argsort(rowids, kind="stable"))
+            frame.index = pd.RangeIndex(len(frame))
+        if dataset.seed_snapshot(DATASETS[dataset_key]["path"], state.mtime, frame):
+            print(f"[data_store] Seeded shared dataset '{dataset_key}' from snapshot ({len(frame)} rows)")
+
+
+def _snapshot_path(key: str) -> Path:
+    return SNAPSHOT_DIR / f"datastore-v{SNAPSHOT_VERSION}-{key}.pkl"
+
+
+def _load_store_snapshot(key: str, seed: bool = True) -> DataStore | None:
+    path = _snapshot_path(key)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as handle:
+            payload = pickle.load(handle)
+        if payload.get("version") != SNAPSHOT_VERSION or payload.get("key") != key:
+            return None
+        store = payload["store"]
+        print(f"[data_store] Loaded prepared snapshot {path.name} ({len(store.combined)} rows)")
+    except Exception as exc:
+        print(f"[data_store] 스냅샷 로드 실패, 원본에서 다시 계산: {exc}")
+        return None
+    if not seed:
+        return store
+    try:
+        # 대시보드가 같은 데이터를 파일에서 다시 읽지 않도록 공용 프레임도 채워 둠
+        _seed_datasets(store, payload.get("dropped_rows", {}))
+    except Exception as exc:
+        print(f"[data_store] 공용 데이터셋 채우기 실패: {exc}")
+    return store
+
+
+def _save_store_snapshot(key: str, store: DataStore) -> None:
+    """Write the prepared store atomically and drop snapshots of older DB versions."""
+    if store.combined.empty:
+        return
+    path = _snapshot_path(key)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as handle:
+            # order_rows는 요청 중에 채워지는 캐시이므로 저장하지 않음
+            pickle.dump(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "key": key,
+                    "store": replace(store, order_rows={}),
+                    "dropped_rows": _dropped_source_rows(store),
+                },
+                handle,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, path)
+        for stale in SNAPSHOT_DIR.glob("datastore-*.pkl"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        print(f"[data_store] Saved prepared snapshot {path.name}")
+    except Exception as exc:
+        print(f"[data_store] 스냅샷 저장 실패: {exc}")
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _save_delta_snapshot(store: DataStore) -> None:
+    # 증분 반영된 store는 파일 해시를 백그라운드에서 계산; 그 사이 DB가 또 바뀌었으면 저장하지 않음
+    key = _snapshot_key()
+    mtimes = _capture_dataset_mtimes()
+    if any(mtimes.get(dataset_key) != state.mtime for dataset_key, state in store.sources.items()):
+        return
+    _save_store_snapshot(key, store)
+
+
+def load_prepared_store() -> DataStore:
+    """DataStore for a process that does not serve requests (export worker processes).
+
+    Loads the on-disk snapshot of the current DB and keeps it for later calls
+    while the DB is unchanged. If that snapshot is not saved yet it is built
+    here, in the calling process, without saving or seeding anything.
+    """
+    global _PREPARED_STORE
+    key = _snapshot_key()
+    if _PREPARED_STORE is not None and _PREPARED_STORE[0] == key:
+        return _PREPARED_STORE[1]
+    store = _load_store_snapshot(key, seed=False)
+    if store is None:
+        store = _initialize_data()
+    _PREPARED_STORE = (key, store)
+    return store
+
+
+def _load_or_build_store(previous: DataStore | None = None) -> DataStore:
+    if previous is not None:
+        try:
+            store = _build_delta_store(previous)
+        except Exception as exc:
+            print(f"[data_store] 증분 반영 실패, 전체 재로딩: {exc}")
+            store = None
+        if store is not None:
+            threading.Thread(
+                target=_save_delta_snapshot, args=(store,), name="datastore-snapshot", daemon=True
+            ).start()
+            return store
+
+    key = _snapshot_key()
+    store = _load_store_snapshot(key)
+    if store is None:
+        store = _initialize_data()
+        # 저장은 요청/시작을 막지 않도록 백그라운드에서 수행
+        threading.Thread(
+            target=_save_store_snapshot, args=(key, store), name="datastore-snapshot", daemon=True
+        ).start()
+    return store
+
+
+def _swap_store(store: DataStore) -> None:
+    """Publish a fully built store as the new epoch (read-copy-update).
+
+    Requests that already hold the previous store keep using it; new requests
+    see the new store. Caches are keyed by epoch so entries never mix.
+    """
+    global DATA_STORE, _CACHE_EPOCH
+    _CACHE_EPOCH += 1
+    store.epoch = _CACHE_EPOCH
+    DATA_STORE = store
+    _FILTER_CACHE.clear()
+    _FACET_CACHE.clear()
+    _ORDER_SELECTION_CACHE.clear()
+    _TABLE_ROWS_CACHE.clear()
+    print(f"[data_store] Dataset epoch {store.epoch} ready ({len(store.combined)} rows)")
+    # 주문 단위 결과 행(materialized view)은 요청을 막지 않도록 백그라운드에서 채움
+    threading.Thread(
+        target=_materialize_order_rows, args=(store,), name="datastore-materialize", daemon=True
+    ).start()
+
+
+def _reload_worker() -> None:
+    global _RELOAD_THREAD, _LOADED_DATA_EPOCH
+    while True:
+        data_epoch = dataset.data_epoch()
+        try:
+            _swap_store(_load_or_build_store(DATA_STORE))
+        except Exception as exc:
+            # 실패한 버전은 기록만 해 두고 이전 세대로 계속 서비스 (다음 DB 변경 시 재시도)
+            print(f"[data_store] 백그라운드 재로딩 실패, 이전 데이터 유지: {exc}")
+        _LOADED_DATA_EPOCH = data_epoch
+
+        with _RELOAD_LOCK:
+            # 빌드 중 DB가 다시 바뀌었으면 한 번 더, 아니면 종료 (그 사이 요청들은 모두 합쳐짐)
+            if dataset.data_epoch() == data_epoch:
+                _RELOAD_THREAD = None
+                return
+
+
+def _request_reload() -> None:
+    """Start a background rebuild unless one is already running."""
+    global _RELOAD_THREAD
+    with _RELOAD_LOCK:
+        if _RELOAD_THREAD is not None:
+            return
+        _RELOAD_THREAD = threading.Thread(target=_reload_worker, name="datastore-reload", daemon=True)
+        _RELOAD_THREAD.start()
+
+
+def _get_data_store() -> DataStore:
+    global _LOADED_DATA_EPOCH
+    store = DATA_STORE
+    if store is None:
+        # 최초 1회만 동기 로딩 (동시 요청은 같은 결과를 기다림)
+        with _INITIAL_LOAD_LOCK:
+            if DATA_STORE is None:
+                dataset.watch(config["path"] for config in DATASETS.values())
+                _LOADED_DATA_EPOCH = dataset.data_epoch()
+                _swap_store(_load_or_build_store())
+            return DATA_STORE
+
+    # 파일 변경 확인은 dataset 감시 스레드가 하므로 요청에서는 epoch만 비교
+    if dataset.data_epoch() != _LOADED_DATA_EPOCH:
+        _request_reload()
+    return store
 
 
 def _extract_word_tokens(text: str) -> List[str]:
@@ -725,7 +1116,8 @@ def _extract_word_tokens(text: str) -> List[str]:
     if pd.isna(text):
         return []
     # Extract all continuous alphanumeric/Korean sequences (splits by special chars and spaces)
-    tokens = re.findall(r'[a-z0-9가-힣]+', str(text).lower())
+    # NFC 정규화: 자모가 분리된(NFD) 한글도 같은 토큰으로 인식
+    tokens = re.findall(r'[a-z0-9가-힣]+', unicodedata.normalize("NFC", str(text).lower()))
     return tokens
 
 
@@ -794,64 +1186,60 @@ def _contains_all_word_tokens(text_tokens: List[str], search_token_sets: List[Se
     return True
 
 
-def _apply_filters(df: pd.DataFrame, selections: Dict[str, str]) -> pd.DataFrame:
-    global _FILTER_CACHE
+def _match_equipment_name(store: DataStore, equipment_name: str) -> np.ndarray:
+    """Row positions in ``store.combined`` matching an equipment-name query.
 
-    # Build a normalized cache key (cache respects dataset reloads via _CACHE_EPOCH)
-    key_fields = (
-        "equipment_no",
-        "order_no",
-        "equipment_name",
-        "top_category",
-        "middle_category",
-        "sub_category",
-        "with_links",
-        "detail_query",
-    )
-    normalized = tuple((k, (selections.get(k, "") or "").strip()) for k in key_fields)
-    cache_key = (_CACHE_EPOCH, id(df), normalized)
+    Uses the word-token index: every search word (or one of its mapped
+    equivalents) must appear as an independent word in Order Short Text, or
+    every word in Equi. Text.
+    """
+    search_tokens = _extract_word_tokens(equipment_name)
+    if not search_tokens:
+        return search_index.EMPTY_POSITIONS
+
+    # 매핑된 용어가 여러 단어면 그 단어들이 모두 있어야 일치
+    token_groups = [
+        [_extract_word_tokens(term) for term in sorted(token_set)]
+        for token_set in _expand_search_tokens_with_mappings(search_tokens)
+    ]
+    positions = search_index.EMPTY_POSITIONS
+    for column in EQUIPMENT_NAME_COLUMNS:
+        index = store.token_indexes.get(column)
+        if index is not None:
+            positions = np.union1d(positions, index.search(token_groups))
+    return positions
 
-    cached_index = _FILTER_CACHE.get(cache_key)
-    if cached_index is not None:
-        try:
-            return df.loc[cached_index]
-        except Exception:
-            pass
 
-    filtered = df
+def _find_order_rows(store: DataStore, order_no: str) -> pd.DataFrame:
+    """Rows of one order in ``store.combined`` (empty if unknown), via the Order No index."""
+    target = (order_no or "").strip()
+    if not target or store.order_index is None:
+        return store.combined.iloc[0:0]
+    return store.combined.take(store.order_index.positions(target))
+
+
+def _normalize_selections(selections: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple((key, (selections.get(key, "") or "").strip()) for key in FILTER_KEYS)
+
 
-    equipment_no = selections.get("equipment_no", "").strip()
-    if equipment_no:
-        filtered = filtered[
-            filtered["Equipment"].str.contains(equipment_no, case=False, na=False)
-        ]
+def _selection_key(store: DataStore, selections: Dict[str, str]) -> SelectionKey:
+    """Cache key of a search: dataset epoch + normalized selections (shared by all search caches)."""
+    return (store.epoch, _normalize_selections(selections))
 
-    order_no = selections.get("order_no", "").strip()
-    if order_no:
-        filtered = filtered[
-            filtered["Order No"].str.contains(order_no, case=False, na=False)
-        ]
+
+def _filter_position_sets(store: DataStore, selections: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """Row positions in ``store.combined`` matching each active row-level filter, keyed by selection key."""
+    position_sets: Dict[str, np.ndarray] = {}
 
     equipment_name = selections.get("equipment_name", "").strip()
     if equipment_name:
-        # 간단 OR 매칭: 입력값 + 매핑 값(한/영)으로 Order Short Text, Equi. Text를 모두 contains 검색
-        base = unicodedata.normalize("NFC", equipment_name.lower())
-        names = set([base])
-        if equipment_name.lower() in _TERM_MAPPINGS:
-            names.add(unicodedata.normalize("NFC", _TERM_MAPPINGS[equipment_name.lower()]))
-        if equipment_name.lower() in _REVERSE_MAPPINGS:
-            names.add(unicodedata.normalize("NFC", _REVERSE_MAPPINGS[equipment_name.lower()]))
-
-        mask = False
-        for col in ["Order Short Text", "Equi. Text"]:
-            if col not in filtered.columns:
-                continue
-            series = filtered[col].fillna("").str.lower().apply(lambda x: unicodedata.normalize("NFC", x))
-            col_mask = False
-            for name in names:
-                col_mask |= series.str.contains(name, na=False, regex=False)
-            mask |= col_mask
-        filtered = filtered[mask]
+        position_sets["equipment_name"] = _match_equipment_name(store, equipment_name)
+
+    # 부분 일치: trigram 후보 고유값만 검증 (str.contains(case=False)와 같은 결과)
+    for column, key in (("Equipment", "equipment_no"), ("Order No", "order_no")):
+        query = selections.get(key, "").strip()
+        if query:
+            position_sets[key] = store.trigram_indexes[column].search(query)
 
     top_category = selections.get("top_category", "").strip()
     # Skip separator lines (they shouldn't be selectable, but just in case)
@@ -860,23 +1248,44 @@ def _apply_filters(df: pd.DataFrame, selections: Dict[str, str]) -> pd.DataFrame
         categories_to_include = [top_category]
         if top_category in _TOP_CATEGORY_INCLUDES:
             categories_to_include.extend(_TOP_CATEGORY_INCLUDES[top_category])
-        filtered = filtered[filtered["Cost Center Text"].isin(categories_to_include)]
+        position_sets["top_category"] = store.filter_indexes["Cost Center Text"].positions_any(categories_to_include)
 
     middle_category = selections.get("middle_category", "").strip()
     if middle_category:
-        filtered = filtered[filtered["WorkCtrAlias"] == middle_category]
+        position_sets["middle_category"] = store.filter_indexes["WorkCtrAlias"].positions(middle_category)
 
     sub_category = selections.get("sub_category", "").strip()
     if sub_category:
-        filtered = filtered[filtered["Object type text"] == sub_category]
+        position_sets["sub_category"] = store.filter_indexes["Object type text"].positions(sub_category)
 
     with_links = selections.get("with_links", "").strip() == "1"
-    if with_links and "HasLongTextLink" in filtered.columns:
-        filtered = filtered[filtered["HasLongTextLink"]]
+    if with_links and "HasLongTextLink" in store.filter_indexes:
+        position_sets["with_links"] = store.filter_indexes["HasLongTextLink"].positions("True")
+
+    return position_sets
+
+
+def _filter_positions(store: DataStore, selections: Dict[str, str]) -> np.ndarray:
+    """Ascending row positions in ``store.combined`` matching ``selections`` (cached per selection key)."""
+    df = store.combined
+    # Build a normalized cache key (cache respects dataset reloads via store.epoch)
+    cache_key = _selection_key(store, selections)
+
+    cached_positions = _FILTER_CACHE.get(cache_key)
+    if cached_positions is not None:
+        return cached_positions
+
+    # 행 단위 조건은 색인에서 행 위치 목록으로 구해 한 번에 교집합 → DataFrame은 한 번만 만듦
+    position_sets = _filter_position_sets(store, selections)
+    if position_sets:
+        positions = search_index.intersect_positions(list(position_sets.values()), len(df))
+    else:
+        positions = np.arange(len(df), dtype=np.int64)
 
     # Detail query filter: search in Material, Material Desc., and 작업자 이름
     detail_query = selections.get("detail_query", "").strip()
     if detail_query:
+        filtered = df.take(positions)
         # Create a mask for rows that match the detail query
         material_match = filtered["Material"].astype(str).str.contains(detail_query, case=False, na=False)
         material_desc_match = filtered["Material Desc."].astype(str).str.contains(detail_query, case=False, na=False)
@@ -889,18 +1298,94 @@ def _apply_filters(df: pd.DataFrame, selections: Dict[str, str]) -> pd.DataFrame
         matching_orders = filtered.loc[row_matches, "Order No"].unique()
 
         # Filter to only include orders that have at least one matching row
-        filtered = filtered[filtered["Order No"].isin(matching_orders)]
+        positions = positions[filtered["Order No"].isin(matching_orders).to_numpy()]
+
+    # Cache row positions instead of the frame; positions are stable per dataset epoch
+    _FILTER_CACHE.set(cache_key, positions)
+    return positions
+
+
+def _apply_filters(store: DataStore, selections: Dict[str, str]) -> pd.DataFrame:
+    df = store.combined
+    positions = _filter_positions(store, selections)
+    if len(positions) == len(df):
+        return df
+    return df.take(positions)
+
+
+def _detail_query_positions(store: DataStore, detail_query: str) -> np.ndarray:
+    """Row positions whose Material, Material Desc. or 작업자 이름 contains ``detail_query``."""
+    df = store.combined
+    row_matches = np.zeros(len(df), dtype=bool)
+    for column in ("Material", "Material Desc.", "작업자 이름"):
+        if column in df.columns:
+            row_matches |= df[column].astype(str).str.contains(detail_query, case=False, na=False).to_numpy()
+    return np.flatnonzero(row_matches)
+
+
+def _compute_facet_counts(store: DataStore, selections: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    """Distinct order counts per top/middle/sub value under the current filters.
 
-    # Cache by index to avoid copying large DataFrame; index is stable per dataset epoch
-    _FILTER_CACHE[cache_key] = filtered.index
-    return filtered
+    Each facet applies every filter except its own (so the counts say what
+    picking another value would return), then counts (value, order) pairs
+    over the encoded codes in one pass.
+    """
+    cache_key = _selection_key(store, selections)
+    cached = _FACET_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
+    facets: Dict[str, Dict[str, int]] = {key: {} for key in FACET_COLUMNS}
+    order_index = store.order_index
+    if order_index is None or store.combined.empty:
+        return facets
+
+    size = len(store.combined)
+    order_codes = order_index.row_codes
+    order_count = len(order_index.keys)
+    position_sets = _filter_position_sets(store, selections)
+    detail_query = selections.get("detail_query", "").strip()
+    detail_positions = _detail_query_positions(store, detail_query) if detail_query else None
 
-def _unique_preserve(values: pd.Series) -> List[str]:
+    for key, column in FACET_COLUMNS.items():
+        value_index = store.filter_indexes.get(column)
+        if value_index is None:
+            continue
+        others = [positions for other_key, positions in position_sets.items() if other_key != key]
+        positions = search_index.intersect_positions(others, size) if others else np.arange(size)
+        if detail_positions is not None:
+            # detail_query는 주문 단위 조건: 다른 조건을 통과한 행 중 일치 행이 있는 주문만 남김
+            matched = np.zeros(order_count, dtype=bool)
+            matched[order_codes[search_index.intersect_positions([positions, detail_positions], size)]] = True
+            positions = positions[matched[order_codes[positions]]]
+
+        counts = search_index.count_distinct(
+            positions, value_index.row_codes, order_codes, len(value_index.keys), order_count
+        )
+        facet = {value: int(count) for value, count in zip(value_index.keys, counts) if count}
+
+        if key == "top_category":
+            # 공통 호기가 포함되는 호기는 _apply_filters와 같이 포함 호기까지 합쳐 주문 수 계산
+            value_codes = value_index.row_codes[positions]
+            for top, includes in _TOP_CATEGORY_INCLUDES.items():
+                ids = value_index.keys.get_indexer([top] + list(includes))
+                in_top = np.isin(value_codes, ids[ids >= 0])
+                count = len(np.unique(order_codes[positions[in_top]]))
+                if count:
+                    facet[top] = count
+                else:
+                    facet.pop(top, None)
+        facets[key] = facet
+
+    _FACET_CACHE.set(cache_key, facets)
+    return facets
+
+
+def _unique_preserve(values: Iterable[object]) -> List[str]:
     seen: set[str] = set()
     ordered: List[str] = []
-    for raw in values.astype(str):
-        value = raw.strip()
+    for raw in values:
+        value = str(raw).strip()
         # Filter out "None", "nan" strings
         if not value or value.lower() in ("none", "nan", "nat") or value in seen:
             continue
@@ -946,19 +1431,19 @@ def _format_work_date_label(row: pd.Series) -> str:
     return ""
 
 
-def _format_work_date_label_for_group(group: pd.DataFrame) -> str:
+def _format_work_date_label_for_group(group: OrderColumns) -> str:
     """Get work date label for an entire order group.
 
     Uses the WorkDateForSort column which contains the minimum (earliest) date
     for the order, ensuring all rows in the same order show the same work date
     and it matches the sorting criteria.
     """
-    if group.empty:
+    work_dates = group.get("WorkDateForSort")
+    if work_dates is None or not len(work_dates):
         return ""
 
     # Use WorkDateForSort from first row (all rows in same order have same value)
-    first = group.iloc[0]
-    work_date = first.get("WorkDateForSort", "")
+    work_date = work_dates[0]
     if work_date and str(work_date).strip() and str(work_date).strip().lower() not in ("none", "nan", "nat", ""):
         return str(work_date).strip()
 
@@ -966,16 +1451,16 @@ def _format_work_date_label_for_group(group: pd.DataFrame) -> str:
     return ""
 
 
-def _collect_confirm_texts(group: pd.DataFrame) -> List[str]:
+def _collect_confirm_texts(group: OrderColumns) -> List[str]:
     columns = ["Confirm text"]
-    if SHORT_TEXT_COLUMN in group.columns:
+    if SHORT_TEXT_COLUMN in group:
         columns.append(SHORT_TEXT_COLUMN)
 
     seen: set[str] = set()
     results: List[str] = []
 
     for column in columns:
-        if column not in group.columns:
+        if column not in group:
             continue
         for value in _unique_preserve(group[column]):
             value = value.strip()
@@ -986,16 +1471,18 @@ def _collect_confirm_texts(group: pd.DataFrame) -> List[str]:
     return results
 
 
-def _collect_work_details(group: pd.DataFrame) -> List[Dict[str, str]]:
+def _collect_work_details(group: OrderColumns) -> List[Dict[str, str]]:
     entries: List[Dict[str, str]] = []
     seen: set[tuple[str, ...]] = set()
 
-    for _, row in group.iterrows():
+    row_count = _order_row_count(group)
+    field_values = [(key, group.get(column, [""] * row_count)) for key, column in WORK_DETAIL_FIELDS]
+    for index in range(row_count):
         entry: Dict[str, str] = {}
         values: List[str] = []
         has_value = False
-        for key, column in WORK_DETAIL_FIELDS:
-            raw = row.get(column, "")
+        for key, column_values in field_values:
+            raw = column_values[index]
             value = "" if pd.isna(raw) else str(raw).strip()
             # Filter out "None", "nan" strings
             if value.lower() in ("none", "nan", "nat"):
@@ -1024,189 +1511,351 @@ def _collect_work_details(group: pd.DataFrame) -> List[Dict[str, str]]:
     return entries
 
 
-def _build_table_rows(filtered: pd.DataFrame, selected_orders: List[str] | None = None) -> List[Dict[str, object]]:
+def _order_row_count(group: OrderColumns) -> int:
+    return len(next(iter(group.values()))) if group else 0
+
+
+def _order_columns(frame: pd.DataFrame) -> OrderColumns:
+    """Plain object arrays of the columns ``_build_order_row`` reads."""
+    return {column: frame[column].to_numpy(dtype=object) for column in ORDER_ROW_COLUMNS if column in frame.columns}
+
+
+def _build_order_row(order_no: str, group: OrderColumns) -> Dict[str, object]:
+    """Build one result row (with its detail payload) from an order's rows, in row order."""
+    row_count = _order_row_count(group)
+
+    def _first(column: str) -> object:
+        values = group.get(column)
+        return values[0] if values is not None and row_count else ""
+
+    confirm_values = _collect_confirm_texts(group)
+    confirm_value = "\n".join(confirm_values)
+
+    long_text_values = _unique_preserve(group.get("정비실적 long text", []))
+    long_text_parts: List[str] = []
+    long_links: List[str] = []
+    for raw_value in long_text_values:
+        cleaned, links = _extract_links(raw_value)
+        if cleaned:
+            long_text_parts.append(cleaned)
+        long_links.extend(links)
+    long_links = list(dict.fromkeys(long_links))
+    long_text_combined = "\n".join(long_text_parts).strip()
+
+    # 자재 4개 컬럼 조합의 중복 제거 (첫 등장 순서 유지)
+    material_columns = [group.get(column, [""] * row_count) for column in ("Material", "Material Desc.", "Qty", "UoM")]
+    material_entries: List[Dict[str, str]] = []
+    for material, description, qty, uom in dict.fromkeys(zip(*material_columns)):
+        entry = {
+            "material": str(material).strip(),
+            "description": str(description).strip(),
+            "qty": str(qty).strip(),
+            "uom": str(uom).strip(),
+        }
+        # Filter out "None", "nan" strings
+        for key in entry:
+            if entry[key].lower() in ("none", "nan", "nat"):
+                entry[key] = ""
+
+        has_text = bool(entry["material"] or entry["description"])
+        qty_value = entry["qty"].replace(",", "")
+        has_qty = False
+        if qty_value:
+            try:
+                has_qty = float(qty_value) > 0
+            except ValueError:
+                has_qty = True
+        if has_text or has_qty:
+            material_entries.append(entry)
+
+    work_date_label = _format_work_date_label_for_group(group)
+    work_details = _collect_work_details(group)
+
+    detail_payload = {
+        "order_no": order_no,
+        "dataset_label": work_date_label,
+        "long_text": long_text_combined,
+        "long_text_links": long_links,
+        "materials": material_entries,
+        "work_details": work_details,
+    }
+
+    has_details = bool(long_text_combined or material_entries or work_details)
+
+    return {
+        "dataset_label": work_date_label,
+        "order_no": order_no,
+        "order_short_text": _first("Order Short Text"),
+        "equipment": _first("Equipment"),
+        "equi_text": _first("Equi. Text"),
+        "workctr": _first("WorkCtr.Text"),
+        "cost_center": _first("Cost Center Text"),
+        "confirm_text": confirm_value,
+        "has_links": bool(long_links),
+        "links": long_links,
+        "long_text": long_text_combined,
+        MATERIAL_COLUMN_KEY: material_entries,
+        "has_details": has_details,
+        "detail_payload": detail_payload,
+    }
+
+
+def _materialize_order_rows(store: DataStore) -> None:
+    """Fill ``store.order_rows`` for every order, best-ranked orders first.
+
+    Runs in a background thread after each swap. Orders carried over from the
+    previous epoch (delta ingest) or already built by a request are skipped,
+    and the thread stops as soon as a newer store is published.
+    """
+    order_index = store.order_index
+    if order_index is None or store.combined.empty:
+        return
+    started = time.perf_counter()
+    # 주문별 행이 연속되도록 행 위치를 주문 순서로 재배열한 배열에서 슬라이스로 꺼냄
+    columns = {column: values[order_index.row_order] for column, values in _order_columns(store.combined).items()}
+    offsets = order_index.row_offsets
+    first_rows = order_index.row_order[offsets[:-1]]
+    built = 0
+    for code in np.argsort(store.combined["OrderRank"].to_numpy()[first_rows], kind="stable"):
+        if DATA_STORE is not store:
+            return
+        order_no = order_index.keys[code]
+        if order_no in store.order_rows:
+            continue
+        start, end = offsets[code], offsets[code + 1]
+        store.order_rows[order_no] = _build_order_row(
+            order_no, {column: values[start:end] for column, values in columns.items()}
+        )
+        built += 1
+    print(f"[data_store] Materialized {built} order rows in {time.perf_counter() - started:.1f}s (epoch {store.epoch})")
+
+
+def _build_table_rows(
+    store: DataStore,
+    filtered: pd.DataFrame,
+    selected_orders: List[str] | None = None,
+    selection_key: SelectionKey | None = None,
+) -> List[Dict[str, object]]:
     if filtered.empty:
         return []
 
-    cache_key = (_CACHE_EPOCH, id(filtered), tuple(selected_orders) if selected_orders is not None else None)
-    cached_rows = _TABLE_ROWS_CACHE.get(cache_key)
-    if cached_rows is not None:
-        return cached_rows
+    cache_key = (selection_key, tuple(selected_orders) if selected_orders is not None else None)
+    if selection_key is not None:
+        cached_rows = _TABLE_ROWS_CACHE.get(cache_key)
+        if cached_rows is not None:
+            return cached_rows
 
     if selected_orders is None:
-        selected_orders = _select_order_numbers(filtered)
+        selected_orders = _select_order_numbers(filtered, selection_key=selection_key)
+
+    # 주문의 모든 행이 결과에 들어 있으면 주문 단위 materialized 행을 그대로 사용.
+    # 일부 행만 남은 주문(with_links 등 행 단위 조건)은 남은 행으로 계산
+    order_index = store.order_index
+    codes = order_index.keys.get_indexer(selected_orders)
+    known = np.where(codes >= 0, codes, 0)
+    offsets = order_index.row_offsets
+    full_counts = offsets[known + 1] - offsets[known]
+    order_ranks = store.combined["OrderRank"].to_numpy()[order_index.row_order[offsets[known]]]
+    filtered_counts = np.bincount(filtered["OrderRank"].to_numpy(), minlength=len(order_index.keys))[order_ranks]
+    filtered_counts[codes < 0] = 0
+
+    partial_orders = [
+        order_no
+        for order_no, count, full in zip(selected_orders, filtered_counts, full_counts)
+        if 0 < count < full
+    ]
+    partial_groups: Dict[str, OrderColumns] = {}
+    if partial_orders:
+        partial = filtered[filtered["Order No"].isin(partial_orders)]
+        partial_columns = _order_columns(partial)
+        for order_no, positions in partial.groupby("Order No", sort=False).indices.items():
+            partial_groups[order_no] = {column: values[positions] for column, values in partial_columns.items()}
 
-    grouped = filtered.groupby("Order No", sort=False)
     rows: List[Dict[str, object]] = []
-
-    for order_no in selected_orders:
-        if order_no not in grouped.groups:
+    for order_no, code, count, full in zip(selected_orders, codes, filtered_counts, full_counts):
+        if not count:
+            continue
+        if count < full:
+            rows.append(_build_order_row(order_no, partial_groups[order_no]))
             continue
+        rows.append(_full_order_row(store, order_no, order_index.row_order[offsets[code]:offsets[code + 1]]))
 
-        group = grouped.get_group(order_no).copy()
-        group.sort_index(inplace=True)
-        first = group.iloc[0]
-
-        confirm_values = _collect_confirm_texts(group)
-        confirm_value = "\n".join(confirm_values)
-
-        long_text_values = _unique_preserve(group["정비실적 long text"])
-        long_text_parts: List[str] = []
-        long_links: List[str] = []
-        for raw_value in long_text_values:
-            cleaned, links = _extract_links(raw_value)
-            if cleaned:
-                long_text_parts.append(cleaned)
-            long_links.extend(links)
-        long_links = list(dict.fromkeys(long_links))
-        long_text_combined = "\n".join(long_text_parts).strip()
-
-        materials_df = (
-            group[["Material", "Material Desc.", "Qty", "UoM"]]
-            .drop_duplicates()
-            .reset_index(drop=True)
-        )
-        material_entries: List[Dict[str, str]] = []
-        for _, material_row in materials_df.iterrows():
-            entry = {
-                "material": str(material_row["Material"]).strip(),
-                "description": str(material_row["Material Desc."]).strip(),
-                "qty": str(material_row["Qty"]).strip(),
-                "uom": str(material_row["UoM"]).strip(),
-            }
-            # Filter out "None", "nan" strings
-            for key in entry:
-                if entry[key].lower() in ("none", "nan", "nat"):
-                    entry[key] = ""
-
-            has_text = bool(entry["material"] or entry["description"])
-            qty_value = entry["qty"].replace(",", "")
-            has_qty = False
-            if qty_value:
-                try:
-                    has_qty = float(qty_value) > 0
-                except ValueError:
-                    has_qty = True
-            if has_text or has_qty:
-                material_entries.append(entry)
-
-        work_date_label = _format_work_date_label_for_group(group)
-        work_details = _collect_work_details(group)
-
-        detail_payload = {
-            "order_no": order_no,
-            "dataset_label": work_date_label,
-            "long_text": long_text_combined,
-            "long_text_links": long_links,
-            "materials": material_entries,
-            "work_details": work_details,
-        }
+    if selection_key is not None:
+        _TABLE_ROWS_CACHE.set(cache_key, rows)
+    return rows
 
-        has_details = bool(long_text_combined or material_entries or work_details)
-
-        rows.append(
-            {
-                "dataset_label": work_date_label,
-                "order_no": order_no,
-                "order_short_text": first.get("Order Short Text", ""),
-                "equipment": first.get("Equipment", ""),
-                "equi_text": first.get("Equi. Text", ""),
-                "workctr": first.get("WorkCtr.Text", ""),
-                "cost_center": first.get("Cost Center Text", ""),
-                "confirm_text": confirm_value,
-                "has_links": bool(long_links),
-                "links": long_links,
-                "long_text": long_text_combined,
-                MATERIAL_COLUMN_KEY: material_entries,
-                "has_details": has_details,
-                "detail_payload": detail_payload,
-            }
-        )
 
-    _TABLE_ROWS_CACHE[cache_key] = rows
+def _full_order_row(store: DataStore, order_no: str, positions: np.ndarray) -> Dict[str, object]:
+    """Materialized row of a whole order, built (and stored) on demand if the background pass has not reached it."""
+    row = store.order_rows.get(order_no)
+    if row is None:
+        row = _build_order_row(order_no, _order_columns(store.combined.take(positions)))
+        store.order_rows[order_no] = row
+    return row
+
+
+def _ranked_order_numbers(store: DataStore, selections: Dict[str, str]) -> List[str]:
+    """Every result order of ``selections`` in display order, cached per selection key.
+
+    Backs cursor pagination: each "더보기" page slices this list instead of
+    filtering and ranking again.
+    """
+    cache_key = (_selection_key(store, selections), "ranked")
+    cached = _ORDER_SELECTION_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    filtered = _apply_filters(store, selections)
+    ranked = _select_order_numbers(filtered, limit=len(filtered))
+    _ORDER_SELECTION_CACHE.set(cache_key, ranked)
+    return ranked
+
+
+def _build_page_rows(
+    store: DataStore, selections: Dict[str, str], order_numbers: Sequence[str]
+) -> List[Dict[str, object]]:
+    """Table rows of ``order_numbers`` under ``selections`` without building the filtered frame.
+
+    Gives the same rows as ``_build_table_rows``: each order's positions are
+    looked up in the cached filter positions, so the cost follows the page
+    size rather than the result size.
+    """
+    positions = _filter_positions(store, selections)
+    if not len(positions):
+        return []
+
+    last = len(positions) - 1
+    matched: List[Tuple[str, np.ndarray, np.ndarray]] = []
+    for order_no in order_numbers:
+        order_positions = store.order_index.positions(order_no)
+        slots = np.minimum(np.searchsorted(positions, order_positions), last)
+        inside = order_positions[positions[slots] == order_positions]
+        if len(inside):
+            matched.append((order_no, order_positions, inside))
+
+    # 일부 행만 남은 주문은 한 번의 take로 모아 주문별로 잘라 씀
+    partial = [inside for _, order_positions, inside in matched if len(inside) < len(order_positions)]
+    if partial:
+        partial_columns = _order_columns(store.combined.take(np.concatenate(partial)))
+    start = 0
+
+    rows: List[Dict[str, object]] = []
+    for order_no, order_positions, inside in matched:
+        if len(inside) < len(order_positions):
+            end = start + len(inside)
+            rows.append(
+                _build_order_row(order_no, {column: values[start:end] for column, values in partial_columns.items()})
+            )
+            start = end
+        else:
+            rows.append(_full_order_row(store, order_no, order_positions))
     return rows
 
 
+def _columnar_rows(rows: List[Dict[str, object]]) -> Dict[str, object]:
+    """Table rows as one array per ``SEARCH_API_COLUMNS`` key; repeated strings become dictionary + codes."""
+    columns: Dict[str, object] = {}
+    for key in SEARCH_API_COLUMNS:
+        values = [row.get(key, "") for row in rows]
+        if key in SEARCH_API_DICTIONARY_COLUMNS:
+            dictionary: Dict[object, int] = {}
+            codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+            columns[key] = {"dictionary": list(dictionary), "codes": codes}
+        else:
+            columns[key] = values
+    return columns
+
+
+# 검색결과 엑셀 컬럼: 주문 기본 정보 / 작업 정보 / 자재 정보 (키는 detail_payload 항목 키)
+EXPORT_BASE_COLUMNS = (
+    ("작업일자", "dataset_label"),
+    ("Order No", "order_no"),
+    ("Order Short Text", "order_short_text"),
+    ("Equipment", "equipment"),
+    ("설비명", "equi_text"),
+    ("설비호기", "cost_center"),
+    ("작업반", "workctr"),
+    ("정비 Short Text", "confirm_text"),
+)
+EXPORT_WORK_COLUMNS = (
+    ("작업 시작일", "start_of_execution"),
+    ("작업자 이름", "worker_name"),
+    ("작업 시간", "actual_work"),
+    ("작업 시간 단위", "work_unit"),
+)
+EXPORT_MATERIAL_COLUMNS = (
+    ("자재 코드", "material"),
+    ("자재 설명", "description"),
+    ("수량", "qty"),
+    ("단위", "uom"),
+)
+EXPORT_LONG_TEXT_COLUMN = "정비실적 Long Text"
+
+
+def _spread_entries(
+    entries: List[List[Dict[str, object]]], starts: np.ndarray, keys: Sequence[Tuple[str, str]], size: int
+) -> Dict[str, np.ndarray]:
+    """Columns of ``size`` rows where order ``i``'s j-th entry lands on row ``starts[i] + j`` (other rows "")."""
+    lengths = np.fromiter((len(items) for items in entries), dtype=np.int64, count=len(entries))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    targets = np.repeat(starts, lengths) + np.arange(int(lengths.sum())) - np.repeat(offsets, lengths)
+    flat = [item for items in entries for item in items]
+    columns: Dict[str, np.ndarray] = {}
+    for column, key in keys:
+        values = np.full(size, "", dtype=object)
+        values[targets] = [item.get(key, "") for item in flat]
+        columns[column] = values
+    return columns
+
+
 def build_excel_export_data(table_rows: List[Dict[str, object]]) -> pd.DataFrame:
     """Convert table rows to flattened DataFrame for Excel export.
 
     Includes basic info + work details + long text + materials from detail_payload.
+    Each order spans max(work details, materials, 1) rows: the j-th work detail
+    and material share row j, basic info repeats and the long text is on the
+    first row only. Built column by column from per-order row counts.
     """
     if not table_rows:
         return pd.DataFrame()
 
-    export_rows: List[Dict[str, str]] = []
-
-    for row in table_rows:
-        detail_payload = row.get("detail_payload", {})
-        work_details = detail_payload.get("work_details", [])
-        materials = detail_payload.get("materials", [])
-        long_text = detail_payload.get("long_text", "")
-
-        # Base row data
-        base_data = {
-            "작업일자": str(row.get("dataset_label", "")),
-            "Order No": str(row.get("order_no", "")),
-            "Order Short Text": str(row.get("order_short_text", "")),
-            "Equipment": str(row.get("equipment", "")),
-            "설비명": str(row.get("equi_text", "")),
-            "설비호기": str(row.get("cost_center", "")),
-            "작업반": str(row.get("workctr", "")),
-            "정비 Short Text": str(row.get("confirm_text", "")),
-        }
-
-        # Determine max count for work details and materials
-        max_work_count = len(work_details)
-        max_material_count = len(materials)
-
-        # If there's no work details or materials, create one row with just base data
-        if max_work_count == 0 and max_material_count == 0:
-            export_row = base_data.copy()
-            export_row["정비실적 Long Text"] = long_text
-            export_rows.append(export_row)
-            continue
-
-        # Create rows for each combination
-        max_count = max(max_work_count, max_material_count, 1)
-
-        for i in range(max_count):
-            export_row = base_data.copy()
-
-            # Add work detail columns
-            if i < max_work_count:
-                work = work_details[i]
-                export_row["작업 시작일"] = work.get("start_of_execution", "")
-                export_row["작업자 이름"] = work.get("worker_name", "")
-                export_row["작업 시간"] = work.get("actual_work", "")
-                export_row["작업 시간 단위"] = work.get("work_unit", "")
-            else:
-                export_row["작업 시작일"] = ""
-                export_row["작업자 이름"] = ""
-                export_row["작업 시간"] = ""
-                export_row["작업 시간 단위"] = ""
-
-            # Add long text (only on first row to avoid repetition)
-            if i == 0:
-                export_row["정비실적 Long Text"] = long_text
-            else:
-                export_row["정비실적 Long Text"] = ""
-
-            # Add material columns
-            if i < max_material_count:
-                material = materials[i]
-                export_row["자재 코드"] = material.get("material", "")
-                export_row["자재 설명"] = material.get("description", "")
-                export_row["수량"] = material.get("qty", "")
-                export_row["단위"] = material.get("uom", "")
-            else:
-                export_row["자재 코드"] = ""
-                export_row["자재 설명"] = ""
-                export_row["수량"] = ""
-                export_row["단위"] = ""
-
-            export_rows.append(export_row)
-
-    return pd.DataFrame(export_rows)
+    payloads = [row.get("detail_payload", {}) for row in table_rows]
+    work_entries = [payload.get("work_details", []) for payload in payloads]
+    material_entries = [payload.get("materials", []) for payload in payloads]
+    row_counts = np.fromiter(
+        (max(len(work), len(materials), 1) for work, materials in zip(work_entries, material_entries)),
+        dtype=np.int64,
+        count=len(table_rows),
+    )
+    starts = np.concatenate(([0], np.cumsum(row_counts)[:-1]))
+    size = int(row_counts.sum())
+
+    columns: Dict[str, np.ndarray] = {
+        column: np.repeat(np.array([str(row.get(key, "")) for row in table_rows], dtype=object), row_counts)
+        for column, key in EXPORT_BASE_COLUMNS
+    }
+    long_text = np.full(size, "", dtype=object)
+    long_text[starts] = [payload.get("long_text", "") for payload in payloads]
+    work_columns = _spread_entries(work_entries, starts, EXPORT_WORK_COLUMNS, size)
+    material_columns = _spread_entries(material_entries, starts, EXPORT_MATERIAL_COLUMNS, size)
+
+    # 작업/자재가 모두 없는 주문은 한 행에 기본 정보 + Long Text만 있고 나머지 칸은 비어 있음(NaN)
+    empty_orders = starts[[not work and not materials for work, materials in zip(work_entries, material_entries)]]
+    if len(empty_orders) == len(table_rows):
+        columns[EXPORT_LONG_TEXT_COLUMN] = long_text
+        return pd.DataFrame(columns)
+    for values in (*work_columns.values(), *material_columns.values()):
+        values[empty_orders] = np.nan
+
+    # 컬럼 순서는 첫 주문 기준: 작업/자재가 없으면 Long Text가 작업 정보보다 앞
+    if not work_entries[0] and not material_entries[0]:
+        columns[EXPORT_LONG_TEXT_COLUMN] = long_text
+        columns.update(work_columns)
+    else:
+        columns.update(work_columns)
+        columns[EXPORT_LONG_TEXT_COLUMN] = long_text
+    columns.update(material_columns)
+    return pd.DataFrame(columns)
 
 
 def insert_blank_rows_between_orders(df: pd.DataFrame) -> pd.DataFrame:
@@ -1221,63 +1870,24 @@ def insert_blank_rows_between_orders(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty or "Order No" not in df.columns:
         return df
 
-    result_rows: List[pd.Series] = []
-    prev_order_no = None
-
-    for idx, row in df.iterrows():
-        current_order_no = row["Order No"]
-
-        # Insert blank row if order number changed (but not for the first row)
-        if prev_order_no is not None and current_order_no != prev_order_no:
-            # Create blank row with same columns
-            blank_row = pd.Series([""] * len(df.columns), index=df.columns)
-            result_rows.append(blank_row)
-
-        result_rows.append(row)
-        prev_order_no = current_order_no
-
-    return pd.DataFrame(result_rows).reset_index(drop=True)
-
+    # Insert blank row if order number changed (but not for the first row)
+    order_nos = df["Order No"].to_numpy(dtype=object)
+    previous = order_nos[:-1]
+    changed = np.fromiter(
+        (prev is not None and current != prev for prev, current in zip(previous, order_nos[1:])),
+        dtype=bool,
+        count=len(order_nos) - 1,
+    )
+    # 각 행의 새 위치 = 원래 위치 + 앞에서 삽입된 빈 행 수; 나머지 위치가 빈 행("")
+    targets = np.arange(len(df)) + np.concatenate(([0], np.cumsum(changed)))
+    size = len(df) + int(changed.sum())
 
-def format_excel_worksheet(worksheet, df: pd.DataFrame) -> None:
-    """Format Excel worksheet for better readability.
+    columns: Dict[str, np.ndarray] = {}
+    for position, column in enumerate(df.columns):
+        values = np.full(size, "", dtype=object)
+        values[targets] = df.iloc[:, position].to_numpy(dtype=object)
+        columns[column] = values
+    return pd.DataFrame(columns, columns=df.columns)
 
-    Adjusts column widths and row heights to make content more visible.
 
-    Args:
-        worksheet: openpyxl worksheet object
-        df: DataFrame that was written to the worksheet
-    """
-    from openpyxl.styles import Alignment
-
-    # Auto-adjust column widths based on content
-    for idx, column in enumerate(df.columns, start=1):
-        column_letter = worksheet.cell(row=1, column=idx).column_letter
-
-        # Calculate max width for this column
-        max_length = len(str(column))  # Start with header length
-
-        for row_idx in range(2, len(df) + 2):  # +2 because Excel is 1-indexed and has header
-            cell_value = worksheet.cell(row=row_idx, column=idx).value
-            if cell_value:
-                # Count newlines for multi-line content
-                cell_str = str(cell_value)
-                lines = cell_str.split('\n')
-                # Get the longest line
-                line_length = max(len(line) for line in lines) if lines else 0
-                max_length = max(max_length, line_length)
-
-        # Set column width with a reasonable limit (between 10 and 80)
-        adjusted_width = min(max(max_length + 2, 10), 80)
-        worksheet.column_dimensions[column_letter].width = adjusted_width
-
-    # Set row heights and enable text wrapping
-    for row_idx in range(1, len(df) + 2):  # +2 for header and 1-indexing
-        # Set row height (default Excel row height is ~15, we use 25 for better readability)
-        worksheet.row_dimensions[row_idx].height = 25
-
-        # Enable text wrapping for all cells in this row
-        for col_idx in range(1, len(df.columns) + 1):
-            cell = worksheet.cell(row=row_idx, column=col_idx)
-            cell.alignment = Alignment(wrap_text=True, vertical='top')
 import unicodedata
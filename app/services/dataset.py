@@ -0,0 +1,550 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app import config
+
+# DB 인코딩 깨진 컬럼명 매핑 (DB가 cp949로 저장되어 UTF-8로 읽을 때 깨짐)
+DB_COLUMN_MAPPINGS: Dict[str, str] = {
+    # 정비실적 관련
+    b'\xec\xa0\x95\xeb\xb9\x84\xec\x8b\xa4\xec\xa0\x81 short text'.decode('utf-8'): "정비실적 short text",
+    b'\xec\xa0\x95\xeb\xb9\x84\xec\x8b\xa4\xec\xa0\x81 long text'.decode('utf-8'): "정비실적 long text",
+    # 작업자 관련
+    b'\xec\x9e\x91\xec\x97\x85\xec\x9e\x90 \xec\x82\xac\xeb\xb2\x88'.decode('utf-8'): "작업자 사번",
+    b'\xec\x9e\x91\xec\x97\x85\xec\x9e\x90 \xec\x9d\xb4\xeb\xa6\x84'.decode('utf-8'): "작업자 이름",
+    # 정비요청 관련
+    b'\xec\xa0\x95\xeb\xb9\x84\xec\x9a\x94\xec\xb2\xad(\xec\x84\xb9\xec\x85\x98)'.decode('utf-8'): "정비요청(섹션)",
+    b'\xec\xa0\x95\xeb\xb9\x84\xec\x9a\x94\xec\xb2\xad(\xec\xa1\xb0)'.decode('utf-8'): "정비요청(조)",
+}
+
+COLUMN_ALIASES: Dict[str, str] = {
+    "Order Long Text": "정비실적 long text",
+    "정비실적 long text": "정비실적 long text",
+    "정비실적 Long Text": "정비실적 long text",
+    "정비실적 Long text": "정비실적 long text",
+    "정비실적  long text": "정비실적 long text",
+    "정비실적_long_text": "정비실적 long text",
+    "정비실적-Long Text": "정비실적 long text",
+    "주요정비실적 Long Text": "정비실적 long text",
+    "주요정비실적 long text": "정비실적 long text",
+    "정비실적LONGTEXT": "정비실적 long text",
+    "정비실적LONG TEXT": "정비실적 long text",
+    "정비 실적 long text": "정비실적 long text",
+    "정비실적\u3000long text": "정비실적 long text",
+    "정비실적\xa0long text": "정비실적 long text",
+    "정비실적\u3000Long Text": "정비실적 long text",
+    "정비실적\xa0Long Text": "정비실적 long text",
+    "정비실적Long Text": "정비실적 long text",
+    "정비실적LongText": "정비실적 long text",
+    "정비실적_Long Text": "정비실적 long text",
+    "정비실적_Long_Text": "정비실적 long text",
+    "정비실적-long text": "정비실적 long text",
+    "정비실적-long-text": "정비실적 long text",
+    "정비실적LONG-TEXT": "정비실적 long text",
+    "정비실적_longtext": "정비실적 long text",
+    "정비실적long text": "정비실적 long text",
+    "정비실적long_text": "정비실적 long text",
+    "정비실적 LONG TEXT": "정비실적 long text",
+    "정비실적 LONG text": "정비실적 long text",
+    "정비실적 LONGText": "정비실적 long text",
+    "정비실적 LONGTEXT": "정비실적 long text",
+    " long text": "정비실적 long text",
+    " long text": "정비실적 long text",
+}
+
+BASE_REQUIRED_COLUMNS = [
+    "Order No",
+    "Equipment",
+    "Order Short Text",
+    "Loc. Text",
+    "Floc. Text",
+    "WorkCtr.Text",
+    "Cost Center Text",
+    "Object type text",
+    "Confirm text",
+    "정비실적 long text",
+    "Material",
+    "Material Desc.",
+    "Qty",
+    "UoM",
+    "Equi. Text",
+]
+
+# Remove decimal points from numeric fields (e.g., 1008483.0 -> 1008483)
+NUMERIC_FIELDS = ["Order No", "Equipment", "Man", "Actual Duration", "Actual Work", "Material", "Qty", "Noti. No"]
+
+
+def _clean_string_series(series: pd.Series) -> pd.Series:
+    return (
+        series.replace({pd.NA: "", "nan": "", "NaN": "", None: ""})
+        .astype(str)
+        .str.strip()
+    )
+
+
+def _apply_column_aliases(df: pd.DataFrame) -> pd.DataFrame:
+    # read_dataset가 방금 읽은 프레임만 넘기므로 복사 없이 그대로 수정
+    result = df
+
+    for source, target in COLUMN_ALIASES.items():
+        if source not in result.columns:
+            continue
+        if source == target:
+            continue
+
+        if target in result.columns:
+            source_clean = _clean_string_series(result[source])
+            target_clean = _clean_string_series(result[target])
+            mask = target_clean == ""
+            if mask.any():
+                result.loc[mask, target] = source_clean[mask]
+            result.drop(columns=[source], inplace=True)
+        else:
+            result.rename(columns={source: target}, inplace=True)
+
+    return result
+
+
+ROWID_COLUMN = "_rowid"
+UPDATED_COLUMN = "last_updated"
+TABLE_NAME = "sap_reports"
+# Delta ingest falls back to a full reload when more than this share of rows changed
+DELTA_MAX_FRACTION = 0.2
+
+# SQL에서 "Order No"를 read_dataset과 같은 규칙(strip, 끝의 .0 제거)으로 정규화
+ORDER_KEY_SQL = (
+    "COALESCE(CASE WHEN TRIM(\"Order No\") LIKE '%.0' "
+    "THEN SUBSTR(TRIM(\"Order No\"), 1, LENGTH(TRIM(\"Order No\")) - 2) "
+    "ELSE TRIM(\"Order No\") END, '')"
+)
+
+
+def _rename_db_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # DB 컬럼명 매핑 적용 (인코딩 깨진 한글 컬럼명 수정)
+    if DB_COLUMN_MAPPINGS:
+        rename_map = {k: v for k, v in DB_COLUMN_MAPPINGS.items() if k in df.columns}
+        if rename_map:
+            df.rename(columns=rename_map, inplace=True)
+            print(f"[dataset] Renamed {len(rename_map)} columns: {list(rename_map.values())}")
+    return df
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply column aliases, blank/NaN cleanup and numeric ``.0`` removal to a raw frame."""
+    df.columns = [str(column).strip() for column in df.columns]
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
+    if COLUMN_ALIASES:
+        df = _apply_column_aliases(df)
+        if df.columns.duplicated().any():
+            df = df.loc[:, ~df.columns.duplicated()]
+
+    df = df.replace({pd.NA: "", "nan": "", "NaN": ""}).fillna("")
+
+    for column in BASE_REQUIRED_COLUMNS:
+        if column not in df.columns:
+            df[column] = ""
+        df[column] = df[column].astype(str).str.strip()
+
+    # Remove decimal points from numeric fields (e.g., 1008483.0 -> 1008483)
+    for field in NUMERIC_FIELDS:
+        if field in df.columns:
+            df[field] = df[field].astype(str).str.replace(r"\.0$", "", regex=True).str.strip()
+
+    if ROWID_COLUMN in df.columns:
+        df[ROWID_COLUMN] = pd.to_numeric(df[ROWID_COLUMN], errors="coerce").fillna(-1).astype("int64")
+    else:
+        df[ROWID_COLUMN] = pd.RangeIndex(len(df), dtype="int64")
+
+    return df
+
+
+# SAP 추출본에서 실제로 보이는 날짜 형식 (정규식이 맞으면 해당 format으로 빠르게 파싱)
+# 그 외 문자열은 pd.to_datetime(format="mixed")로 처리하므로 결과는 mixed 파싱과 같음
+DATE_FORMATS: List[Tuple[str, str]] = [
+    (r"\d{4}-\d{2}-\d{2}", "%Y-%m-%d"),
+    (r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", "%Y-%m-%d %H:%M:%S"),
+    (r"\d{4}\.\d{2}\.\d{2}", "%Y.%m.%d"),
+    (r"\d{8}", "%Y%m%d"),
+]
+_DATE_BLANKS = {"None": "", "nan": "", "NaN": "", "nat": "", "NaT": ""}
+
+
+def _parse_distinct_dates(values: pd.Series) -> np.ndarray:
+    parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    remaining = np.ones(len(values), dtype=bool)
+    text = values.astype(str)
+    for pattern, date_format in DATE_FORMATS:
+        matches = remaining & text.str.fullmatch(pattern).to_numpy(dtype=bool)
+        if matches.any():
+            parsed[matches] = pd.to_datetime(text[matches], format=date_format, errors="coerce").to_numpy()
+            remaining &= ~matches
+    if remaining.any():
+        parsed[remaining] = pd.to_datetime(values[remaining], format="mixed", errors="coerce").to_numpy()
+    return parsed
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Parse a date column like ``pd.to_datetime(format="mixed", errors="coerce")``.
+
+    Each distinct string is parsed once and the results are broadcast back
+    by factorize codes; strings in one of ``DATE_FORMATS`` skip the per-value
+    format inference.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = _parse_distinct_dates(pd.Series(uniques, dtype=object))
+    result = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    known = codes >= 0
+    result[known] = parsed[codes[known]]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def date_part_codes(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Date portion (text before the first space) of each value as sortable codes.
+
+    Returns ``(codes, labels)``: ``labels`` holds the distinct date strings
+    sorted as strings ("" for blanks), so comparing codes compares the
+    strings. Cleanup runs on distinct values only.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    cleaned = (
+        pd.Series(uniques, dtype=object)
+        .fillna("")
+        .astype(str)
+        .str.strip()
+        .replace(_DATE_BLANKS)
+        .str.split(" ").str[0]
+    )
+    label_codes, labels = pd.factorize(cleaned, sort=True)
+    return label_codes[codes], np.asarray(labels, dtype=object)
+
+
+def _read_sql_text(conn: sqlite3.Connection, query: str) -> pd.DataFrame:
+    """Read ``query`` with every value as text and SQL NULL as "".
+
+    ``read_sql_query(dtype=str)`` would turn NULL into the literal string
+    "None", which the blank cleanup in ``normalize_frame`` cannot tell apart
+    from real text, so NULLs are filled before the string conversion.
+    """
+    return pd.read_sql_query(query, conn).fillna("").astype(str)
+
+
+def read_dataset(path: Path) -> pd.DataFrame:
+    print(f"[dataset] read_dataset called with: {path}")
+    print(f"[dataset] File exists: {path.exists()}, suffix: {path.suffix}")
+
+    if not path.exists():
+        print(f"[dataset] ERROR: File does not exist!")
+        return normalize_frame(pd.DataFrame(columns=BASE_REQUIRED_COLUMNS))
+
+    # Check if file is SQLite database
+    if path.suffix.lower() == '.db':
+        print(f"[dataset] Reading SQLite database...")
+        try:
+            conn = sqlite3.connect(str(path))
+            # rowid를 함께 읽어 증분 반영(delta ingest) 시 변경 행을 식별
+            df = _read_sql_text(conn, f'SELECT rowid AS "{ROWID_COLUMN}", * FROM {TABLE_NAME} ORDER BY rowid')
+            conn.close()
+            print(f"[dataset] Loaded {len(df)} rows from database")
+            df = _rename_db_columns(df)
+        except Exception as exc:
+            print(f"[dataset] ERROR reading database: {exc}")
+            raise RuntimeError(f"Failed to read SQLite database {path}: {exc}")
+    else:
+        # Read CSV file with encoding fallback
+        encodings = ("utf-8-sig", "cp949", "utf-8")
+        last_error: Exception | None = None
+        for encoding in encodings:
+            try:
+                df = pd.read_csv(path, dtype=str, low_memory=False, encoding=encoding)
+                break
+            except UnicodeDecodeError as exc:
+                last_error = exc
+        else:
+            if last_error is not None:
+                raise last_error
+            df = pd.DataFrame(columns=BASE_REQUIRED_COLUMNS)
+
+    return normalize_frame(df)
+
+
+@dataclass(frozen=True)
+class SourceState:
+    """What a frame was read from; used to fetch only rows changed since then."""
+
+    mtime: float
+    row_count: int
+    max_rowid: int
+    max_updated: str
+    columns: Tuple[str, ...]
+
+
+def _table_columns(conn: sqlite3.Connection) -> Tuple[str, ...]:
+    return tuple(row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_NAME})"))
+
+
+def source_state(path: Path, frame: pd.DataFrame, mtime: float) -> SourceState | None:
+    """Describe the SQLite source a full read produced ``frame`` from."""
+    if path.suffix.lower() != ".db" or not path.exists():
+        return None
+    conn = sqlite3.connect(str(path))
+    try:
+        columns = _table_columns(conn)
+    finally:
+        conn.close()
+    max_rowid = int(frame[ROWID_COLUMN].max()) if len(frame) else 0
+    max_updated = str(frame[UPDATED_COLUMN].max()) if UPDATED_COLUMN in frame.columns and len(frame) else ""
+    return SourceState(mtime, len(frame), max_rowid, max_updated, columns)
+
+
+def _read_order_rows(conn: sqlite3.Connection, order_keys: Iterable[str]) -> pd.DataFrame:
+    # IN (?, ?, ...) 대신 임시 테이블로 조인해 SQLite 변수 개수 제한을 피함
+    conn.execute("DROP TABLE IF EXISTS temp._order_keys")
+    conn.execute("CREATE TEMP TABLE _order_keys (order_key TEXT PRIMARY KEY)")
+    conn.executemany(
+        "INSERT OR IGNORE INTO temp._order_keys (order_key) VALUES (?)",
+        ((key,) for key in order_keys),
+    )
+    df = _read_sql_text(
+        conn,
+        f'SELECT rowid AS "{ROWID_COLUMN}", * FROM {TABLE_NAME} '
+        f"WHERE {ORDER_KEY_SQL} IN (SELECT order_key FROM temp._order_keys) ORDER BY rowid",
+    )
+    conn.execute("DROP TABLE IF EXISTS temp._order_keys")
+    return normalize_frame(_rename_db_columns(df))
+
+
+def iter_raw_order_rows(
+    path: Path, order_nos: Iterable[str], chunksize: int = 20000
+) -> Iterator[pd.DataFrame]:
+    """Original DB rows whose ``Order No`` equals one of ``order_nos``, in rowid order, ``chunksize`` rows at a time.
+
+    The values are loaded into an indexed temp table and joined in one scan,
+    instead of ``IN (?, ?, ...)`` which hits SQLite's variable limit for
+    large selections. Columns and values are returned as stored (no renaming
+    or normalization).
+    """
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("CREATE TEMP TABLE _export_orders (order_no TEXT PRIMARY KEY)")
+        conn.executemany(
+            "INSERT OR IGNORE INTO temp._export_orders (order_no) VALUES (?)",
+            ((order_no,) for order_no in order_nos),
+        )
+        yield from pd.read_sql_query(
+            f'SELECT * FROM {TABLE_NAME} WHERE "Order No" IN (SELECT order_no FROM temp._export_orders) ORDER BY rowid',
+            conn,
+            chunksize=chunksize,
+        )
+    finally:
+        conn.close()
+
+
+def read_delta(
+    path: Path, state: SourceState, known_orders: Callable[[List[int]], Iterable[str]]
+) -> Tuple[SourceState, Set[str], pd.DataFrame] | None:
+    """Read every row of the orders changed since ``state``.
+
+    Changed rows are those appended after ``state.max_rowid`` or stamped with a
+    newer ``last_updated``. ``known_orders`` maps changed rowids to the orders
+    they belonged to before, so rows moved between orders refresh both sides.
+    Returns ``(new_state, touched_order_keys, rows)``, or ``None`` when only a
+    full reload is safe (schema change, deleted rows, no ``last_updated``
+    column, or too many changes).
+    """
+    if path.suffix.lower() != ".db" or not path.exists():
+        return None
+    mtime = _file_mtime(path)
+    conn = sqlite3.connect(str(path))
+    try:
+        # 한 읽기 트랜잭션 안에서 상태와 변경분을 함께 읽어 일관성 유지
+        conn.execute("BEGIN")
+        columns = _table_columns(conn)
+        if columns != state.columns or UPDATED_COLUMN not in columns:
+            return None
+
+        kept_count = conn.execute(
+            f"SELECT COUNT(*) FROM {TABLE_NAME} WHERE rowid <= ?", (state.max_rowid,)
+        ).fetchone()[0]
+        if kept_count != state.row_count:
+            return None
+
+        changed = conn.execute(
+            f"SELECT rowid, {ORDER_KEY_SQL} FROM {TABLE_NAME} "
+            f"WHERE rowid > ? OR COALESCE({UPDATED_COLUMN}, '') > ?",
+            (state.max_rowid, state.max_updated),
+        ).fetchall()
+        total_count, max_rowid, max_updated = conn.execute(
+            f"SELECT COUNT(*), COALESCE(MAX(rowid), 0), COALESCE(MAX({UPDATED_COLUMN}), '') FROM {TABLE_NAME}"
+        ).fetchone()
+        if len(changed) > max(1, total_count) * DELTA_MAX_FRACTION:
+            return None
+
+        touched = {key for _, key in changed}
+        touched.update(known_orders([rowid for rowid, _ in changed if rowid <= state.max_rowid]))
+        rows = _read_order_rows(conn, touched) if touched else normalize_frame(pd.DataFrame(columns=list(columns)))
+        new_state = SourceState(mtime, int(total_count), int(max_rowid), str(max_updated), columns)
+        return new_state, touched, rows
+    finally:
+        conn.close()
+
+
+@dataclass
+class DatasetSnapshot:
+    path: Path
+    mtime: float
+    frame: pd.DataFrame
+
+    def view(self) -> pd.DataFrame:
+        """Return a shallow view of the shared frame.
+
+        Adding or replacing columns on the view does not touch the shared
+        frame, but values must not be modified in place (``.loc[...] = ...``).
+        """
+        return self.frame.copy(deep=False)
+
+
+_SNAPSHOTS: Dict[Path, DatasetSnapshot] = {}
+_LOAD_LOCK = threading.Lock()
+
+
+def _file_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def file_fingerprint(
+    path: Path, chunk_size: int = 4 * 1024 * 1024, known: Tuple[int, float, str] | None = None
+) -> Tuple[int, float, str]:
+    """Return (size, mtime, content hash) of ``path`` for keying on-disk caches.
+
+    ``known`` is a fingerprint taken earlier; while the size and mtime still
+    match it is returned as-is instead of hashing the whole file again.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return 0, 0.0, ""
+    if known is not None and (known[0], known[1]) == (stat.st_size, stat.st_mtime):
+        return known
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return stat.st_size, stat.st_mtime, digest.hexdigest()
+
+
+def peek_snapshot(path: Path) -> DatasetSnapshot | None:
+    """The loaded snapshot of ``path`` (possibly stale), without reading the file."""
+    return _SNAPSHOTS.get(Path(path))
+
+
+def seed_snapshot(path: Path, mtime: float, frame: pd.DataFrame) -> bool:
+    """Install ``frame`` as the normalized dataset of ``path`` read at ``mtime``.
+
+    Lets a caller that already holds the data (e.g. a prepared store loaded
+    from disk) spare other users a second read of the file. Ignored when the
+    file changed since ``mtime`` or that version is already loaded.
+    """
+    key = Path(path)
+    with _LOAD_LOCK:
+        snapshot = _SNAPSHOTS.get(key)
+        if _file_mtime(key) != mtime or (snapshot is not None and snapshot.mtime == mtime):
+            return False
+        _SNAPSHOTS[key] = DatasetSnapshot(path=key, mtime=mtime, frame=frame)
+        return True
+
+
+def apply_delta(path: Path, base_mtime: float, new_mtime: float, touched: Set[str], rows: pd.DataFrame) -> None:
+    """Patch the shared frame with a delta read elsewhere, if it is still at ``base_mtime``."""
+    key = Path(path)
+    with _LOAD_LOCK:
+        snapshot = _SNAPSHOTS.get(key)
+        if snapshot is None or snapshot.mtime != base_mtime:
+            return
+        frame = snapshot.frame
+        kept = frame[~frame["Order No"].isin(touched)]
+        patched = pd.concat([kept, rows], ignore_index=True)
+        patched = patched.sort_values(ROWID_COLUMN, kind="stable", ignore_index=True)
+        _SNAPSHOTS[key] = DatasetSnapshot(path=key, mtime=new_mtime, frame=patched)
+
+
+# 데이터 버전 레지스트리: 감시 스레드가 등록된 파일의 mtime을 주기적으로 확인하고
+# 바뀌면 data_epoch를 올림. 검색 DataStore와 대시보드 캐시는 요청마다 stat 하지 않고 이 값만 비교
+_WATCHED_MTIMES: Dict[Path, float] = {}
+_DATA_EPOCH = 0
+_WATCH_LOCK = threading.Lock()
+_WATCH_THREAD: threading.Thread | None = None
+
+
+def watch(paths: Iterable[Path]) -> None:
+    """Register data files with the version registry (starts the watcher thread on first use)."""
+    global _WATCH_THREAD
+    with _WATCH_LOCK:
+        for path in paths:
+            key = Path(path)
+            if key not in _WATCHED_MTIMES:
+                _WATCHED_MTIMES[key] = _file_mtime(key)
+        if _WATCH_THREAD is None:
+            _WATCH_THREAD = threading.Thread(target=_watch_loop, name="dataset-watch", daemon=True)
+            _WATCH_THREAD.start()
+
+
+def poll_sources() -> bool:
+    """Stat every watched file once; bump the data epoch if any changed. Returns whether it did."""
+    global _DATA_EPOCH
+    with _WATCH_LOCK:
+        changed = False
+        for key, mtime in _WATCHED_MTIMES.items():
+            current = _file_mtime(key)
+            if current != mtime:
+                _WATCHED_MTIMES[key] = current
+                changed = True
+        if changed:
+            _DATA_EPOCH += 1
+            print(f"[dataset] Data files changed, data epoch {_DATA_EPOCH}")
+        return changed
+
+
+def _watch_loop() -> None:
+    while True:
+        time.sleep(config.DATA_POLL_SECONDS)
+        try:
+            poll_sources()
+        except Exception as exc:
+            print(f"[dataset] 데이터 파일 확인 실패: {exc}")
+
+
+def data_epoch() -> int:
+    """Monotonically increasing version of the watched data files."""
+    return _DATA_EPOCH
+
+
+def get_snapshot(path: Path) -> DatasetSnapshot:
+    """Return the normalized dataset for ``path``, reading the file only when it changed."""
+    key = Path(path)
+    mtime = _file_mtime(key)
+    snapshot = _SNAPSHOTS.get(key)
+    if snapshot is not None and snapshot.mtime == mtime:
+        return snapshot
+
+    # 검색/대시보드가 동시에 요청해도 파일은 한 번만 읽도록 직렬화
+    with _LOAD_LOCK:
+        snapshot = _SNAPSHOTS.get(key)
+        if snapshot is not None and snapshot.mtime == mtime:
+            return snapshot
+        snapshot = DatasetSnapshot(path=key, mtime=mtime, frame=read_dataset(key))
+        _SNAPSHOTS[key] = snapshot
+        return snapshot
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from app import config
+
+# 백그라운드 Excel export 작업: 별도 프로세스(spawn) 풀에서 최대 EXPORT_MAX_WORKERS개만 동시에 실행.
+# 행 생성/openpyxl 쓰기가 GIL을 오래 잡으므로 요청을 처리하는 인터프리터와 분리함.
+# 워커는 진행 상황을 EXPORT_DIR/<id>.json에, 결과를 <id>.xlsx.part에 쓴 뒤 <id>.xlsx로 이름을 바꿈.
+# 완료 파일은 EXPORT_JOB_TTL초 후 삭제. 작업 목록은 요청 프로세스 메모리에만 보관하므로
+# 정리 스레드가 시작 시점과 EXPORT_SWEEP_SECONDS마다 EXPORT_DIR에 남은 파일(이전 프로세스 포함)도 지움
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# EXPORT_DIR에서 작업이 만드는 파일 이름 (<job id>.xlsx / .xlsx.part / .json 및 그 임시 파일)
+_JOB_FILE_PATTERN = re.compile(r"^([0-9a-f]{32})\.(?:xlsx|xlsx\.part|json|json\.\d+\.tmp)$")
+
+
+@dataclass
+class JobProgress:
+    """Progress counters of one job, updated by the worker process.
+
+    Each update is mirrored to ``<id>.json`` in ``EXPORT_DIR`` where the
+    request process reads it back (``get``). With an empty ``job_id`` (e.g.
+    the synchronous ``/export``) updates stay in memory.
+    """
+
+    job_id: str = ""
+    orders_total: int = 0
+    orders_done: int = 0
+    rows_written: int = 0
+
+    def update(self, **counts: int) -> None:
+        for name, value in counts.items():
+            setattr(self, name, value)
+        if self.job_id:
+            _write_progress(self)
+
+
+@dataclass
+class ExportJob:
+    job_id: str
+    download_name: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    orders_total: int = 0
+    orders_done: int = 0
+    rows_written: int = 0
+    path: Path | None = None
+    error: str = ""
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "download_name": self.download_name,
+            "orders_total": self.orders_total,
+            "orders_done": self.orders_done,
+            "rows_written": self.rows_written,
+            "error": self.error,
+        }
+
+
+# 워커 프로세스에서 실행되는 작업 함수 (모듈 수준 함수여야 pickle 가능):
+# task(progress, output, *args) -> 다운로드 이름. 내보낼 행이 없으면 예외를 던짐
+ExportTask = Callable[..., str]
+
+_JOBS: Dict[str, ExportJob] = {}
+_JOBS_LOCK = threading.Lock()
+_EXECUTOR: ProcessPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+_SWEEP_LOCK = threading.Lock()
+_SWEEP_THREAD: threading.Thread | None = None
+
+
+def _output_path(job_id: str) -> Path:
+    return config.EXPORT_DIR / f"{job_id}.xlsx"
+
+
+def _progress_path(job_id: str) -> Path:
+    return config.EXPORT_DIR / f"{job_id}.json"
+
+
+def _write_progress(progress: JobProgress) -> None:
+    path = _progress_path(progress.job_id)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps({"status": RUNNING, **asdict(progress)}), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"[export_jobs] 진행 상황 기록 실패 ({progress.job_id}): {exc}")
+
+
+def _read_progress(job: ExportJob) -> None:
+    """Copy the worker's latest progress onto ``job`` (no-op until the worker has written any)."""
+    try:
+        progress = json.loads(_progress_path(job.job_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    job.orders_total = int(progress.get("orders_total", job.orders_total))
+    job.orders_done = int(progress.get("orders_done", job.orders_done))
+    job.rows_written = int(progress.get("rows_written", job.rows_written))
+    if job.status == QUEUED:
+        job.status = RUNNING
+
+
+def _init_worker() -> None:
+    # 코어가 부족할 때도 검색 요청이 먼저 CPU를 받도록 워커 우선순위를 낮춤 (os.nice가 없는 Windows는 그대로)
+    if config.EXPORT_WORKER_NICE > 0 and hasattr(os, "nice"):
+        try:
+            os.nice(config.EXPORT_WORKER_NICE)
+        except OSError as exc:
+            print(f"[export_jobs] 워커 우선순위 조정 실패: {exc}")
+
+
+def _executor() -> ProcessPoolExecutor:
+    # spawn: 여러 스레드가 도는 서버 프로세스를 fork하지 않음. 워커는 필요한 데이터를 스스로 읽음
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=max(config.EXPORT_MAX_WORKERS, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _EXECUTOR
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is broken:
+            _EXECUTOR = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _expire_jobs() -> None:
+    """Drop finished jobs older than ``EXPORT_JOB_TTL`` together with their files."""
+    cutoff = time.time() - config.EXPORT_JOB_TTL
+    with _JOBS_LOCK:
+        expired = [job for job in _JOBS.values() if job.finished_at is not None and job.finished_at < cutoff]
+        for job in expired:
+            del _JOBS[job.job_id]
+    for job in expired:
+        for path in (_output_path(job.job_id), _progress_path(job.job_id)):
+            path.unlink(missing_ok=True)
+
+
+def sweep() -> int:
+    """Expire finished jobs and delete job files older than the TTL that no live job owns.
+
+    Covers files left by earlier processes (job state is not persisted).
+    Files younger than the TTL are kept, since another worker process
+    sharing ``EXPORT_DIR`` may still serve them. Returns the number removed.
+    """
+    _expire_jobs()
+    cutoff = time.time() - config.EXPORT_JOB_TTL
+    with _JOBS_LOCK:
+        owned = set(_JOBS)
+    removed = 0
+    try:
+        candidates = list(config.EXPORT_DIR.iterdir())
+    except OSError:
+        return 0
+    for path in candidates:
+        match = _JOB_FILE_PATTERN.match(path.name)
+        if match is None or match.group(1) in owned:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    if removed:
+        print(f"[export_jobs] Removed {removed} expired export files")
+    return removed
+
+
+def _sweep_loop() -> None:
+    while True:
+        try:
+            sweep()
+        except Exception as exc:
+            print(f"[export_jobs] export 파일 정리 실패: {exc}")
+        time.sleep(config.EXPORT_SWEEP_SECONDS)
+
+
+def start_sweeper() -> None:
+    """Start the cleanup thread once per process; it sweeps right away and then periodically."""
+    global _SWEEP_THREAD
+    with _SWEEP_LOCK:
+        if _SWEEP_THREAD is None:
+            _SWEEP_THREAD = threading.Thread(target=_sweep_loop, name="export-sweep", daemon=True)
+            _SWEEP_THREAD.start()
+
+
+def _work(job_id: str, task: ExportTask, args: Tuple[object, ...]) -> str:
+    """Worker-process side of a job: run ``task`` into ``<id>.xlsx.part`` and publish it as ``<id>.xlsx``."""
+    config.EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    progress = JobProgress(job_id)
+    progress.update()
+    path = _output_path(job_id)
+    part_path = path.with_name(f"{path.name}.part")
+    try:
+        with open(part_path, "wb") as output:
+            download_name = task(progress, output, *args)
+        os.replace(part_path, path)
+    finally:
+        part_path.unlink(missing_ok=True)
+    return download_name
+
+
+def _finish(job: ExportJob, future: Future) -> None:
+    _read_progress(job)
+    try:
+        job.download_name = future.result()
+        job.path = _output_path(job.job_id)
+        job.status = DONE
+    except Exception as exc:
+        print(f"[export_jobs] Job {job.job_id} failed: {exc}")
+        job.error = str(exc) or type(exc).__name__
+        job.status = FAILED
+    finally:
+        job.finished_at = time.time()
+
+
+def submit(task: ExportTask, args: Tuple[object, ...], download_name: str) -> ExportJob:
+    """Queue ``task(progress, output, *args)`` on the export process pool and return its job (poll with ``get``).
+
+    ``task`` and ``args`` are pickled to the worker, so pass plain data
+    (selections, order numbers), never the DataStore.
+    """
+    _expire_jobs()
+    job = ExportJob(job_id=uuid.uuid4().hex, download_name=download_name)
+    with _JOBS_LOCK:
+        _JOBS[job.job_id] = job
+    executor = _executor()
+    try:
+        future = executor.submit(_work, job.job_id, task, args)
+    except BrokenProcessPool:
+        # 워커가 비정상 종료되면 풀을 새로 만들어 한 번 더 시도
+        _reset_executor(executor)
+        future = _executor().submit(_work, job.job_id, task, args)
+    future.add_done_callback(partial(_finish, job))
+    return job
+
+
+def get(job_id: str) -> ExportJob | None:
+    _expire_jobs()
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    if job is not None and job.finished_at is None:
+        _read_progress(job)
+    return job
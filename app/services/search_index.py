@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 인덱스는 DataStore.combined의 행 위치(0..n-1)를 가리킴. combined가 바뀌면 새로 만들거나 patch()로 옮겨야 함
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+# 이 문자가 들어간 검색어는 정규식으로 보고 trigram 후보 없이 고유값 전체를 검사
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+
+def _group_positions(codes: np.ndarray, value_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (row positions ordered by value code, offsets) so value ``v`` owns ``order[offsets[v]:offsets[v+1]]``."""
+    valid = codes >= 0
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(codes[valid], kind="stable")]
+    counts = np.bincount(codes[valid], minlength=value_count)
+    offsets = np.zeros(value_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return order.astype(np.int64, copy=False), offsets
+
+
+def _row_codes(row_order: np.ndarray, row_offsets: np.ndarray) -> np.ndarray:
+    """Inverse of ``_group_positions`` for an index where every row has a value."""
+    codes = np.empty(len(row_order), dtype=np.int64)
+    codes[row_order] = np.repeat(np.arange(len(row_offsets) - 1), np.diff(row_offsets))
+    return codes
+
+
+def _patch_codes(
+    old_codes: np.ndarray, source: np.ndarray, known: Sequence[str], values: pd.Series
+) -> Tuple[np.ndarray, List[str]]:
+    """Value codes of a patched column plus the distinct values appended after ``known``.
+
+    ``source[i]`` is the old row position of row ``i`` or -1 for a re-read
+    row. Carried rows keep their old code; only the re-read rows are
+    factorized, and values not in ``known`` get new ids after the existing ones.
+    """
+    added_mask = source < 0
+    codes = np.empty(len(source), dtype=np.int64)
+    codes[~added_mask] = old_codes[source[~added_mask]]
+    added_codes, uniques = pd.factorize(values.iloc[np.flatnonzero(added_mask)].astype(str), sort=False)
+    ids = pd.Index(known).get_indexer(uniques)
+    new = ids < 0
+    ids[new] = len(known) + np.arange(int(new.sum()))
+    codes[added_mask] = ids[added_codes]
+    return codes, [str(value) for value in uniques[new]]
+
+
+def _mostly_dead(codes: np.ndarray, value_count: int) -> bool:
+    # 더 이상 어떤 행도 가리키지 않는 값 id가 절반을 넘으면 patch 대신 다시 만듦 (postings 누적 방지)
+    live = np.count_nonzero(np.bincount(codes[codes >= 0], minlength=value_count))
+    return (value_count - live) * 2 > value_count
+
+
+def _add_postings(
+    postings: Dict[str, np.ndarray], texts: Iterable[str], start: int, split: Callable[[str], Iterable[str]]
+) -> Dict[str, np.ndarray]:
+    """Copy of ``postings`` with value ids ``start, start + 1, ...`` of ``texts`` appended (ids stay sorted)."""
+    key_values: Dict[str, List[int]] = {}
+    for value_id, text in enumerate(texts, start=start):
+        for key in set(split(text)):
+            key_values.setdefault(key, []).append(value_id)
+    merged = dict(postings)
+    for key, ids in key_values.items():
+        added = np.asarray(ids, dtype=np.int64)
+        existing = merged.get(key)
+        merged[key] = added if existing is None else np.concatenate([existing, added])
+    return merged
+
+
+def _trigrams(text: str) -> Iterable[str]:
+    lowered = text.lower()
+    return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+
+@dataclass
+class TokenIndex:
+    """Word-token inverted index over the distinct values of one text column.
+
+    Postings are kept per distinct value: ``token -> value ids``. A query
+    intersects those (small) sets first and only then expands the surviving
+    values into row positions, so a multi-word query never touches rows that
+    cannot match.
+    """
+
+    values: List[str]
+    postings: Dict[str, np.ndarray]
+    row_order: np.ndarray
+    row_offsets: np.ndarray
+
+    @classmethod
+    def build(cls, values: pd.Series, tokenize: Callable[[str], Iterable[str]]) -> TokenIndex:
+        codes, uniques = pd.factorize(values.astype(str), sort=False)
+        row_order, row_offsets = _group_positions(codes, len(uniques))
+        uniques = [str(value) for value in uniques]
+        postings = _add_postings({}, uniques, 0, tokenize)
+        return cls(values=uniques, postings=postings, row_order=row_order, row_offsets=row_offsets)
+
+    def patch(
+        self, values: pd.Series, source: np.ndarray, tokenize: Callable[[str], Iterable[str]]
+    ) -> TokenIndex:
+        """Index of the patched column ``values``; only values new to this index are tokenized.
+
+        ``source`` maps each row of ``values`` to its row position in the old
+        column (-1 for re-read rows). Values that no longer occur keep their id
+        with an empty row slice until most ids are unused, then it is rebuilt.
+        """
+        codes, added = _patch_codes(_row_codes(self.row_order, self.row_offsets), source, self.values, values)
+        value_count = len(self.values) + len(added)
+        if _mostly_dead(codes, value_count):
+            return TokenIndex.build(values, tokenize)
+        row_order, row_offsets = _group_positions(codes, value_count)
+        return TokenIndex(
+            values=self.values + added,
+            postings=_add_postings(self.postings, added, len(self.values), tokenize),
+            row_order=row_order,
+            row_offsets=row_offsets,
+        )
+
+    def value_ids(self, token: str) -> np.ndarray:
+        return self.postings.get(token, EMPTY_POSITIONS)
+
+    def match_values(self, token_groups: Sequence[Sequence[Sequence[str]]]) -> np.ndarray:
+        """Value ids containing every group; a group matches if any of its alternatives does.
+
+        Each alternative is a list of tokens that must all be present, so a
+        mapped term such as "feed pump" still requires both words.
+        """
+        result: np.ndarray | None = None
+        for alternatives in token_groups:
+            group_ids = EMPTY_POSITIONS
+            for tokens in alternatives:
+                if not tokens:
+                    continue
+                ids = self.value_ids(tokens[0])
+                for token in tokens[1:]:
+                    if not len(ids):
+                        break
+                    ids = np.intersect1d(ids, self.value_ids(token), assume_unique=True)
+                group_ids = np.union1d(group_ids, ids)
+            result = group_ids if result is None else np.intersect1d(result, group_ids, assume_unique=True)
+            if not len(result):
+                break
+        return EMPTY_POSITIONS if result is None else result
+
+    def search(self, token_groups: Sequence[Sequence[Sequence[str]]]) -> np.ndarray:
+        return _rows_for_values(self.row_order, self.row_offsets, self.match_values(token_groups))
+
+
+@dataclass
+class TrigramIndex:
+    """Trigram index over the distinct values of one column for substring search.
+
+    Reproduces ``Series.str.contains(query, case=False)``: a literal query
+    intersects the postings of its trigrams to get candidate values and
+    verifies only those. Queries shorter than three characters, or using
+    regex syntax, are checked against the distinct values instead of rows.
+    """
+
+    values: List[str]
+    postings: Dict[str, np.ndarray]
+    row_order: np.ndarray
+    row_offsets: np.ndarray
+
+    @classmethod
+    def build(cls, values: pd.Series) -> TrigramIndex:
+        codes, uniques = pd.factorize(values.astype(str), sort=False)
+        row_order, row_offsets = _group_positions(codes, len(uniques))
+        uniques = [str(value) for value in uniques]
+        postings = _add_postings({}, uniques, 0, _trigrams)
+        return cls(values=uniques, postings=postings, row_order=row_order, row_offsets=row_offsets)
+
+    def patch(self, values: pd.Series, source: np.ndarray) -> TrigramIndex:
+        """Index of the patched column ``values`` (see ``TokenIndex.patch``)."""
+        codes, added = _patch_codes(_row_codes(self.row_order, self.row_offsets), source, self.values, values)
+        value_count = len(self.values) + len(added)
+        if _mostly_dead(codes, value_count):
+            return TrigramIndex.build(values)
+        row_order, row_offsets = _group_positions(codes, value_count)
+        return TrigramIndex(
+            values=self.values + added,
+            postings=_add_postings(self.postings, added, len(self.values), _trigrams),
+            row_order=row_order,
+            row_offsets=row_offsets,
+        )
+
+    def match_values(self, query: str) -> np.ndarray:
+        # str.contains 기본값과 같이 정규식으로 해석 (잘못된 패턴은 기존처럼 re.error)
+        pattern = re.compile(query, re.IGNORECASE)
+        lowered = query.lower()
+        if len(lowered) < 3 or _REGEX_META & set(query):
+            candidates: Iterable[int] = range(len(self.values))
+        else:
+            ids: np.ndarray | None = None
+            for gram in {lowered[i:i + 3] for i in range(len(lowered) - 2)}:
+                gram_ids = self.postings.get(gram, EMPTY_POSITIONS)
+                ids = gram_ids if ids is None else np.intersect1d(ids, gram_ids, assume_unique=True)
+                if not len(ids):
+                    return EMPTY_POSITIONS
+            candidates = ids.tolist()
+        matched = [value_id for value_id in candidates if pattern.search(self.values[value_id])]
+        return np.asarray(matched, dtype=np.int64)
+
+    def search(self, query: str) -> np.ndarray:
+        return _rows_for_values(self.row_order, self.row_offsets, self.match_values(query))
+
+
+@dataclass
+class KeyIndex:
+    """Exact-match index from a column value to the slice of its row positions."""
+
+    keys: pd.Index
+    row_order: np.ndarray
+    row_offsets: np.ndarray
+    # 행 위치 -> 값 id (facet 집계용)
+    row_codes: np.ndarray
+
+    @classmethod
+    def build(cls, values: pd.Series) -> KeyIndex:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # category 컬럼은 이미 정수 코드가 있으므로 그대로 사용
+            codes = values.cat.codes.to_numpy(dtype=np.int64)
+            uniques = values.cat.categories.astype(str)
+        else:
+            codes, uniques = pd.factorize(values.astype(str), sort=False)
+        row_order, row_offsets = _group_positions(codes, len(uniques))
+        return cls(
+            keys=pd.Index(uniques),
+            row_order=row_order,
+            row_offsets=row_offsets,
+            row_codes=codes.astype(np.int32),
+        )
+
+    def patch(self, values: pd.Series, source: np.ndarray) -> KeyIndex:
+        """Index of the patched column ``values`` (``source`` as in ``TokenIndex.patch``).
+
+        Only re-read rows are factorized; keys left without rows are dropped so
+        every key still owns at least one row. A category column already
+        carries its codes and is simply rebuilt from them.
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return KeyIndex.build(values)
+        codes, added = _patch_codes(self.row_codes, source, self.keys, values)
+        keys = self.keys.append(pd.Index(added, dtype=object))
+        live = np.bincount(codes[codes >= 0], minlength=len(keys)) > 0
+        remap = np.cumsum(live) - 1
+        codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+        row_order, row_offsets = _group_positions(codes, int(live.sum()))
+        return KeyIndex(
+            keys=keys[live],
+            row_order=row_order,
+            row_offsets=row_offsets,
+            row_codes=codes.astype(np.int32),
+        )
+
+    def positions(self, key: str) -> np.ndarray:
+        """Row positions of ``key`` in ascending order (empty if absent)."""
+        value_id = self.keys.get_indexer([key])[0]
+        if value_id < 0:
+            return EMPTY_POSITIONS
+        return self.row_order[self.row_offsets[value_id]:self.row_offsets[value_id + 1]]
+
+    def positions_any(self, keys: Sequence[str]) -> np.ndarray:
+        """Sorted row positions matching any of ``keys``."""
+        value_ids = self.keys.get_indexer(list(keys))
+        return _rows_for_values(self.row_order, self.row_offsets, np.unique(value_ids[value_ids >= 0]))
+
+
+def count_distinct(
+    positions: np.ndarray, value_codes: np.ndarray, group_codes: np.ndarray, value_count: int, group_count: int
+) -> np.ndarray:
+    """Per value id, the number of distinct group ids among ``positions`` (e.g. orders per category)."""
+    values = value_codes[positions].astype(np.int64)
+    groups = group_codes[positions].astype(np.int64)
+    valid = (values >= 0) & (groups >= 0)
+    pairs = np.unique(values[valid] * group_count + groups[valid])
+    return np.bincount(pairs // max(group_count, 1), minlength=value_count)
+
+
+def intersect_positions(position_sets: Sequence[np.ndarray], size: int) -> np.ndarray:
+    """Intersect sorted row-position arrays of a frame with ``size`` rows.
+
+    Starts from the smallest set and filters it through a boolean membership
+    mask per other set, so no intermediate DataFrame is built.
+    """
+    ordered = sorted(position_sets, key=len)
+    result = ordered[0]
+    for positions in ordered[1:]:
+        if not len(result):
+            break
+        member = np.zeros(size, dtype=bool)
+        member[positions] = True
+        result = result[member[result]]
+    return result
+
+
+def _rows_for_values(row_order: np.ndarray, row_offsets: np.ndarray, value_ids: np.ndarray) -> np.ndarray:
+    """Sorted row positions of the given value ids."""
+    if not len(value_ids):
+        return EMPTY_POSITIONS
+    starts = row_offsets[value_ids]
+    ends = row_offsets[value_ids + 1]
+    parts = [row_order[start:end] for start, end in zip(starts, ends)]
+    return np.sort(np.concatenate(parts))
@@ -40,6 +40,131 @@ document.addEventListener("DOMContentLoaded", () => {
     updateExportHref();
   }
 
+  if (exportResultsBtn) {
+    const exportLabel = exportResultsBtn.textContent.trim();
+    let exportRunning = false;
+
+    const resetExportBtn = () => {
+      exportRunning = false;
+      exportResultsBtn.textContent = exportLabel;
+    };
+
+    // 큰 검색결과도 요청이 끊기지 않도록 서버 export 작업으로 만들고 진행률을 표시한 뒤 다운로드
+    const pollExportJob = (statusUrl, downloadUrl) => {
+      fetch(statusUrl, { method: "GET" })
+        .then((response) => {
+          if (!response.ok) {
+            throw new Error(`Failed to load export status (${response.status})`);
+          }
+          return response.json();
+        })
+        .then((job) => {
+          if (job.status === "done") {
+            resetExportBtn();
+            window.location = downloadUrl;
+            return;
+          }
+          if (job.status === "failed") {
+            resetExportBtn();
+            exportResultsBtn.textContent = "Excel 생성 실패 - 다시 시도";
+            return;
+          }
+          // 주문 처리가 끝나면 시트에 기록한 행 수를 표시
+          let progress = "";
+          if (job.rows_written) {
+            progress = ` (${job.rows_written.toLocaleString()}행 기록)`;
+          } else if (job.orders_total) {
+            progress = ` (${job.orders_done.toLocaleString()}/${job.orders_total.toLocaleString()}건)`;
+          }
+          exportResultsBtn.textContent = `Excel 생성 중${progress}`;
+          window.setTimeout(() => pollExportJob(statusUrl, downloadUrl), 1000);
+        })
+        .catch((error) => {
+          console.error(error);
+          resetExportBtn();
+        });
+    };
+
+    exportResultsBtn.addEventListener("click", (event) => {
+      // 작업 URL이 없으면 기본 링크(동기 다운로드)로 진행
+      const jobsPath = exportResultsBtn.getAttribute("data-jobs-url");
+      if (!jobsPath) return;
+      event.preventDefault();
+      if (exportRunning) return;
+      exportRunning = true;
+      exportResultsBtn.textContent = "Excel 생성 중";
+
+      const exportUrl = new URL(exportResultsBtn.href, window.location.origin);
+      const jobsUrl = new URL(jobsPath, window.location.origin);
+      jobsUrl.search = exportUrl.search;
+      fetch(jobsUrl, { method: "POST" })
+        .then((response) => {
+          if (!response.ok) {
+            throw new Error(`Failed to start export (${response.status})`);
+          }
+          return response.json();
+        })
+        .then((job) => pollExportJob(job.status_url, job.download_url))
+        .catch((error) => {
+          // 작업 생성에 실패하면 기존 동기 다운로드로 진행
+          console.error(error);
+          resetExportBtn();
+          window.location = exportResultsBtn.href;
+        });
+    });
+  }
+
+  const loadMoreBtn = document.querySelector(".load-more-btn[data-rows-url]");
+  const resultRows = document.getElementById("result-rows");
+  if (loadMoreBtn && resultRows) {
+    const resultCountEl = document.getElementById("result-count");
+    const resultShownEl = document.getElementById("result-shown");
+    let rowsUrl = loadMoreBtn.getAttribute("data-rows-url");
+    let loading = false;
+
+    // 다음 페이지 행만 받아 표 끝에 붙임. 커서가 만료되면(데이터 재로딩) 기존 링크로 이동
+    loadMoreBtn.addEventListener("click", (event) => {
+      if (!rowsUrl) return;
+      event.preventDefault();
+      if (loading) return;
+      loading = true;
+
+      const previousShown = resultCountEl ? Number(resultCountEl.textContent) || 0 : 0;
+      fetch(rowsUrl, { method: "GET" })
+        .then((response) => {
+          if (!response.ok) {
+            throw new Error(`Failed to load rows (${response.status})`);
+          }
+          return response.json();
+        })
+        .then((data) => {
+          resultRows.insertAdjacentHTML("beforeend", data.rows_html);
+          if (resultCountEl) resultCountEl.textContent = data.shown;
+          if (resultShownEl) resultShownEl.textContent = data.shown;
+
+          if (!data.next_cursor) {
+            const container = loadMoreBtn.closest(".load-more");
+            if (container) container.remove();
+            return;
+          }
+          const nextUrl = new URL(rowsUrl, window.location.origin);
+          nextUrl.searchParams.set("cursor", data.next_cursor);
+          rowsUrl = nextUrl.pathname + nextUrl.search;
+
+          const fallbackUrl = new URL(loadMoreBtn.href, window.location.origin);
+          fallbackUrl.searchParams.set("limit", data.shown + (data.shown - previousShown));
+          loadMoreBtn.href = fallbackUrl.pathname + fallbackUrl.search;
+        })
+        .catch((error) => {
+          console.error(error);
+          window.location = loadMoreBtn.href;
+        })
+        .finally(() => {
+          loading = false;
+        });
+    });
+  }
+
   const modal = document.getElementById("detail-modal");
   if (!modal) return;
 